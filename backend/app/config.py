@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     port: int
     model: str
@@ -19,6 +19,14 @@ class AppConfig:
     llm_max_retries: int
     llm_retry_backoff_ms: int
     llm_fallback_enabled: bool
+    llm_timeout_s: float
+    llm_cache_enabled: bool
+    llm_cache_ttl_s: int
+    llm_cache_max_entries: int
+    llm_semantic_cache_enabled: bool
+    llm_semantic_cache_threshold: float
+    llm_semantic_cache_max_entries: int
+    llm_coalesce_enabled: bool
     rate_limit_enabled: bool
     rate_limit_window_s: int
     rate_limit_max_requests: int
@@ -30,6 +38,11 @@ class AppConfig:
     prewarm_enabled: bool
     prewarm_provision_enabled: bool
     provision_url_warm_limit: int
+    background_max_concurrency: int
+    max_upload_bytes: int
+    hnsw_m: int
+    hnsw_ef_construction: int
+    hnsw_ef_search: int
 
 
 def _to_bool(value: Any, default: bool) -> bool:
@@ -49,6 +62,15 @@ def _to_int(value: Any, default: int) -> int:
         return default
 
 
+def _to_float(value: Any, default: float) -> float:
+    try:
+        if value is None or value == "":
+            return default
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
 def _load_file_config(root_dir: Path) -> Dict[str, Any]:
     config_path = os.getenv("VIDHI_CONFIG_FILE", "").strip()
     if not config_path:
@@ -115,6 +137,14 @@ def load_app_config(root_dir: Path) -> AppConfig:
         llm_max_retries=max(0, _to_int(_get(source, "llm_max_retries", "VIDHI_LLM_MAX_RETRIES", 2), 2)),
         llm_retry_backoff_ms=max(50, _to_int(_get(source, "llm_retry_backoff_ms", "VIDHI_LLM_RETRY_BACKOFF_MS", 300), 300)),
         llm_fallback_enabled=_to_bool(_get(source, "llm_fallback_enabled", "VIDHI_LLM_FALLBACK_ENABLED", True), True),
+        llm_timeout_s=max(1.0, _to_float(_get(source, "llm_timeout_s", "VIDHI_LLM_TIMEOUT_S", 90), 90.0)),
+        llm_cache_enabled=_to_bool(_get(source, "llm_cache_enabled", "VIDHI_LLM_CACHE_ENABLED", True), True),
+        llm_cache_ttl_s=max(1, _to_int(_get(source, "llm_cache_ttl_s", "VIDHI_LLM_CACHE_TTL_S", 1800), 1800)),
+        llm_cache_max_entries=max(16, _to_int(_get(source, "llm_cache_max_entries", "VIDHI_LLM_CACHE_MAX_ENTRIES", 512), 512)),
+        llm_semantic_cache_enabled=_to_bool(_get(source, "llm_semantic_cache_enabled", "VIDHI_LLM_SEMANTIC_CACHE_ENABLED", False), False),
+        llm_semantic_cache_threshold=min(1.0, max(0.5, _to_float(_get(source, "llm_semantic_cache_threshold", "VIDHI_LLM_SEMANTIC_CACHE_THRESHOLD", 0.95), 0.95))),
+        llm_semantic_cache_max_entries=max(16, _to_int(_get(source, "llm_semantic_cache_max_entries", "VIDHI_LLM_SEMANTIC_CACHE_MAX_ENTRIES", 256), 256)),
+        llm_coalesce_enabled=_to_bool(_get(source, "llm_coalesce_enabled", "VIDHI_LLM_COALESCE_ENABLED", True), True),
         rate_limit_enabled=_to_bool(_get(source, "rate_limit_enabled", "VIDHI_RATE_LIMIT_ENABLED", True), True),
         rate_limit_window_s=max(1, _to_int(_get(source, "rate_limit_window_s", "VIDHI_RATE_LIMIT_WINDOW_S", 60), 60)),
         rate_limit_max_requests=max(1, _to_int(_get(source, "rate_limit_max_requests", "VIDHI_RATE_LIMIT_MAX_REQUESTS", 120), 120)),
@@ -126,4 +156,9 @@ def load_app_config(root_dir: Path) -> AppConfig:
         prewarm_enabled=_to_bool(_get(source, "prewarm_enabled", "VIDHI_PREWARM_ENABLED", False), False),
         prewarm_provision_enabled=_to_bool(_get(source, "prewarm_provision_enabled", "VIDHI_PREWARM_PROVISION_ENABLED", False), False),
         provision_url_warm_limit=max(1, _to_int(_get(source, "provision_url_warm_limit", "VIDHI_PROVISION_URL_WARM_LIMIT", 4), 4)),
+        background_max_concurrency=max(1, _to_int(_get(source, "background_max_concurrency", "VIDHI_BACKGROUND_MAX_CONCURRENCY", 4), 4)),
+        max_upload_bytes=max(1024, _to_int(_get(source, "max_upload_bytes", "VIDHI_MAX_UPLOAD_BYTES", 20 * 1024 * 1024), 20 * 1024 * 1024)),
+        hnsw_m=max(2, _to_int(_get(source, "hnsw_m", "VIDHI_HNSW_M", 16), 16)),
+        hnsw_ef_construction=max(1, _to_int(_get(source, "hnsw_ef_construction", "VIDHI_HNSW_EF_CONSTRUCTION", 200), 200)),
+        hnsw_ef_search=max(1, _to_int(_get(source, "hnsw_ef_search", "VIDHI_HNSW_EF_SEARCH", 100), 100)),
     )
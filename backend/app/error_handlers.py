@@ -26,6 +26,24 @@ def http_error_payload(err: HttpError) -> Dict[str, Any]:
     }
 
 
+def unhandled_exception_response(logger: logging.Logger, exc: Exception) -> JSONResponse:
+    log_event(
+        logger,
+        logging.ERROR,
+        "unhandled_exception",
+        exc_info=exc,
+        error=str(exc),
+    )
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": str(exc),
+            "code": "INTERNAL_ERROR",
+            "userMessage": "Something went wrong on the server. Please retry.",
+        },
+    )
+
+
 def install_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(HttpError)
     async def _http_error_handler(_: Request, exc: HttpError) -> JSONResponse:
@@ -41,17 +59,4 @@ def install_exception_handlers(app: FastAPI) -> None:
 
     @app.exception_handler(Exception)
     async def _generic_error_handler(_: Request, exc: Exception) -> JSONResponse:
-        log_event(
-            app.state.request_logger,
-            logging.ERROR,
-            "unhandled_exception",
-            error=str(exc),
-        )
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": str(exc),
-                "code": "INTERNAL_ERROR",
-                "userMessage": "Something went wrong on the server. Please retry.",
-            },
-        )
+        return unhandled_exception_response(app.state.request_logger, exc)
@@ -7,7 +7,7 @@ from typing import Any, Dict, Iterable, List
 from backend.app.error_handlers import HttpError
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PromptOutputContract:
     root_key: str
     root_type: type
@@ -39,11 +39,14 @@ PROMPT_OUTPUT_CONTRACTS: Dict[str, PromptOutputContract] = {
     ),
 }
 
-_FORBIDDEN_PATTERNS: tuple[re.Pattern[str], ...] = (
-    re.compile(r"ignore\s+previous\s+instructions", re.IGNORECASE),
-    re.compile(r"(reveal|print|show).*(system\s+prompt|developer\s+message)", re.IGNORECASE),
-    re.compile(r"<script", re.IGNORECASE),
+_FORBIDDEN_PATTERN = re.compile(
+    r"ignore\s+previous\s+instructions"
+    r"|(?:reveal|print|show).*(?:system\s+prompt|developer\s+message)"
+    r"|<script",
+    re.IGNORECASE,
 )
+# Joins payload strings for a single scan; neither `.` nor `\s` matches across it.
+_SCAN_TEXT_SEPARATOR = "\n\x00"
 
 
 
@@ -83,6 +86,21 @@ def _validate_contract(task: str, payload: Dict[str, Any]) -> List[str]:
 
 
 
+def _build_scan_text(payload: Dict[str, Any]) -> str:
+    parts: List[str] = []
+    for text in _iter_strings(payload):
+        if len(text) > 20000:
+            raise HttpError(
+                status=502,
+                code="SAFETY_FILTER_BLOCKED",
+                message="LLM output exceeded maximum allowed field length",
+                user_message="AI response was blocked by safety filters. Please retry with shorter input.",
+            )
+        parts.append(text)
+    return _SCAN_TEXT_SEPARATOR.join(parts)
+
+
+
 def apply_output_guardrails(task: str, payload: Any) -> Dict[str, Any]:
     if not isinstance(payload, dict):
         raise HttpError(
@@ -101,21 +119,12 @@ def apply_output_guardrails(task: str, payload: Any) -> Dict[str, Any]:
             user_message="AI response was incomplete for the requested task. Please retry.",
         )
 
-    for text in _iter_strings(payload):
-        if len(text) > 20000:
-            raise HttpError(
-                status=502,
-                code="SAFETY_FILTER_BLOCKED",
-                message="LLM output exceeded maximum allowed field length",
-                user_message="AI response was blocked by safety filters. Please retry with shorter input.",
-            )
-        for pattern in _FORBIDDEN_PATTERNS:
-            if pattern.search(text):
-                raise HttpError(
-                    status=502,
-                    code="SAFETY_FILTER_BLOCKED",
-                    message="LLM output matched forbidden safety pattern",
-                    user_message="AI response was blocked by safety filters. Please retry.",
-                )
+    if _FORBIDDEN_PATTERN.search(_build_scan_text(payload)):
+        raise HttpError(
+            status=502,
+            code="SAFETY_FILTER_BLOCKED",
+            message="LLM output matched forbidden safety pattern",
+            user_message="AI response was blocked by safety filters. Please retry.",
+        )
 
     return payload
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from datetime import UTC, datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from urllib.parse import parse_qs, urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+# Each listing date shape paired with the format that parses it.
+_DATE_PATTERNS = (
+    (re.compile(r"(\d{2}-[A-Za-z]{3}-\d{4})"), "%d-%b-%Y"),
+    (re.compile(r"(\d{2}/\d{2}/\d{4})"), "%d/%m/%Y"),
+    (re.compile(r"(\d{4}-\d{2}-\d{2})"), "%Y-%m-%d"),
+)
+
 
 class SupremeCourtCaseFetcher:
     """Fetches publicly accessible Supreme Court of India case snippets."""
@@ -54,58 +63,67 @@ class SupremeCourtCaseFetcher:
         seen = set()
 
         async with httpx.AsyncClient(timeout=self._timeout_s, follow_redirects=True) as client:
-            for page_url in self._source_pages:
-                try:
-                    response = await client.get(page_url)
-                except Exception:
+            # Listing pages are independent, so fetch them together and parse in their original order.
+            pages = await asyncio.gather(*[self._fetch_page(client, page_url) for page_url in self._source_pages])
+
+        for page_url, html in zip(self._source_pages, pages):
+            if html is None:
+                continue
+
+            soup = BeautifulSoup(html, "html.parser")
+            for anchor in soup.find_all("a"):
+                label = " ".join(anchor.get_text(" ", strip=True).split())
+                if not label or len(label) < 16:
+                    continue
+
+                parsed_date = self._extract_date(label)
+                if parsed_date is None or parsed_date < min_date:
+                    continue
+                if not self._is_criminal_case(label):
                     continue
-                if response.status_code >= 300:
+
+                href = (anchor.get("href") or "").strip()
+                source_url = urljoin(page_url, href) if href else page_url
+                if not self._has_verdict_marker(label=label, source_url=source_url):
                     continue
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                for anchor in soup.find_all("a"):
-                    label = " ".join(anchor.get_text(" ", strip=True).split())
-                    if not label or len(label) < 16:
-                        continue
-
-                    parsed_date = self._extract_date(label)
-                    if parsed_date is None or parsed_date < min_date:
-                        continue
-                    if not self._is_criminal_case(label):
-                        continue
-
-                    href = (anchor.get("href") or "").strip()
-                    source_url = urljoin(page_url, href) if href else page_url
-                    if not self._has_verdict_marker(label=label, source_url=source_url):
-                        continue
-
-                    case_id = self._build_id(label=label, date_iso=parsed_date.isoformat(), source_url=source_url)
-                    if case_id in seen:
-                        continue
-                    seen.add(case_id)
-
-                    title = self._extract_title(label)
-                    summary = self._extract_summary(label)
-                    collected.append(
-                        {
-                            "id": case_id,
-                            "title": title,
-                            "category": "Criminal Law",
-                            "summary": summary,
-                            "text": label,
-                            "source_name": "Supreme Court of India",
-                            "source_url": source_url,
-                            "authority": "Supreme Court of India",
-                            "jurisdiction": "India",
-                            "tags": ["criminal law", "supreme court", "india", "public source", "verdict"],
-                            "updated_at": parsed_date.isoformat(),
-                        }
-                    )
-                    if len(collected) >= limit:
-                        return collected
+                case_id = self._build_id(label=label, date_iso=parsed_date.isoformat(), source_url=source_url)
+                if case_id in seen:
+                    continue
+                seen.add(case_id)
+
+                title = self._extract_title(label)
+                summary = self._extract_summary(label)
+                collected.append(
+                    {
+                        "id": case_id,
+                        "title": title,
+                        "category": "Criminal Law",
+                        "summary": summary,
+                        "text": label,
+                        "source_name": "Supreme Court of India",
+                        "source_url": source_url,
+                        "authority": "Supreme Court of India",
+                        "jurisdiction": "India",
+                        "tags": ["criminal law", "supreme court", "india", "public source", "verdict"],
+                        "updated_at": parsed_date.isoformat(),
+                    }
+                )
+                if len(collected) >= limit:
+                    return collected
 
         return collected
 
+    @staticmethod
+    async def _fetch_page(client: httpx.AsyncClient, page_url: str) -> Optional[str]:
+        try:
+            response = await client.get(page_url)
+        except Exception:
+            return None
+        if response.status_code >= 300:
+            return None
+        return response.text
+
     def _is_criminal_case(self, text: str) -> bool:
         normalized = text.lower()
         return any(token in normalized for token in self._criminal_tokens)
@@ -131,30 +149,22 @@ class SupremeCourtCaseFetcher:
 
     @staticmethod
     def _extract_summary(text: str) -> str:
-        compact = re.sub(r"\s+", " ", text).strip()
-        return compact[:320]
+        return " ".join(text.split())[:320]
 
     @staticmethod
     def _build_id(label: str, date_iso: str, source_url: str) -> str:
         normalized = f"{label.lower()}|{date_iso}|{source_url.lower()}"
-        cleaned = re.sub(r"[^a-z0-9]+", "-", normalized).strip("-")
+        cleaned = _NON_ALNUM_RE.sub("-", normalized).strip("-")
         return cleaned[:96]
 
     @staticmethod
     def _extract_date(text: str):
-        patterns = [
-            r"(\d{2}-[A-Za-z]{3}-\d{4})",
-            r"(\d{2}/\d{2}/\d{4})",
-            r"(\d{4}-\d{2}-\d{2})",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern, fmt in _DATE_PATTERNS:
+            match = pattern.search(text)
             if not match:
                 continue
-            value = match.group(1)
-            for fmt in ("%d-%b-%Y", "%d/%m/%Y", "%Y-%m-%d"):
-                try:
-                    return datetime.strptime(value, fmt).date()
-                except ValueError:
-                    continue
+            try:
+                return datetime.strptime(match.group(1), fmt).date()
+            except ValueError:
+                continue
         return None
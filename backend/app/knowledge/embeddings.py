@@ -5,11 +5,21 @@ import math
 import os
 import re
 from collections import OrderedDict
+from functools import lru_cache
 from threading import Lock
-from typing import List
+from typing import Dict, List
 
 from langchain_core.embeddings import Embeddings
 
+_TOKEN_RE = re.compile(r"[a-zA-Z0-9_]+")
+
+
+@lru_cache(maxsize=65536)
+def _token_slot(token: str, dimensions: int) -> tuple[int, float]:
+    # Legal text reuses a small vocabulary, so each token's sha256 bucket and sign are computed once.
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % dimensions, 1.0 if (digest[4] & 1) == 0 else -1.0
+
 
 class HashEmbeddings(Embeddings):
     """Lightweight deterministic embeddings with no external model dependency."""
@@ -21,7 +31,19 @@ class HashEmbeddings(Embeddings):
         self._cache_lock = Lock()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self._embed(text) for text in texts]
+        # Ingest chunks bypass the query LRU so a large batch cannot evict hot queries; repeats are hashed once.
+        # A freshly computed vector is handed out as-is; only repeats of the same text get a copy.
+        computed: Dict[str, List[float]] = {}
+        out: List[List[float]] = []
+        for text in texts:
+            key = (text or "").strip().lower()
+            vector = computed.get(key)
+            if vector is None:
+                vector = computed[key] = self._compute(key)
+                out.append(vector)
+            else:
+                out.append(list(vector))
+        return out
 
     def embed_query(self, text: str) -> List[float]:
         return self._embed(text)
@@ -34,24 +56,28 @@ class HashEmbeddings(Embeddings):
                 self._cache.move_to_end(cache_key)
                 return list(cached)
 
+        normalized = self._compute((text or "").strip().lower())
+        if not any(normalized):
+            return normalized
+        with self._cache_lock:
+            self._cache[cache_key] = normalized
+            self._cache.move_to_end(cache_key)
+            if len(self._cache) > self._cache_max_entries:
+                self._cache.popitem(last=False)
+        return list(normalized)
+
+    def _compute(self, text: str) -> List[float]:
         vector = [0.0] * self._dimensions
-        tokens = re.findall(r"[a-zA-Z0-9_]+", (text or "").lower())
+        tokens = _TOKEN_RE.findall(text)
         if not tokens:
             return vector
 
+        dimensions = self._dimensions
         for token in tokens:
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            index = int.from_bytes(digest[:4], "big") % self._dimensions
-            sign = 1.0 if (digest[4] & 1) == 0 else -1.0
+            index, sign = _token_slot(token, dimensions)
             vector[index] += sign
 
         norm = math.sqrt(sum(value * value for value in vector))
         if norm == 0:
             return vector
-        normalized = [value / norm for value in vector]
-        with self._cache_lock:
-            self._cache[cache_key] = normalized
-            self._cache.move_to_end(cache_key)
-            if len(self._cache) > self._cache_max_entries:
-                self._cache.popitem(last=False)
-        return list(normalized)
+        return [value / norm for value in vector]
@@ -1,29 +1,48 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import os
 from datetime import UTC, datetime, timedelta
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .case_fetcher import SupremeCourtCaseFetcher
+from ..config import AppConfig, load_app_config
+from ..serialization import dumps_bytes, loads
 from .vector_store import LangChainVectorStore
 
+if TYPE_CHECKING:
+    from .case_fetcher import SupremeCourtCaseFetcher
+
 
 class KnowledgeIngestionPipeline:
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, config: Optional[AppConfig] = None):
+        config = config or load_app_config(root_dir)
         self._root_dir = root_dir
         self._data_dir = root_dir / "backend" / "data" / "knowledge"
         self._court_cases_dir = self._data_dir / "court_cases"
         self._chroma_dir = self._data_dir / "chroma_db"
         self._court_cases_dir.mkdir(parents=True, exist_ok=True)
         self._chroma_dir.mkdir(parents=True, exist_ok=True)
-        self._store = LangChainVectorStore(persist_directory=str(self._chroma_dir), collection_name="vidhi_cases")
-        self._fetcher = SupremeCourtCaseFetcher()
+        self._store = LangChainVectorStore(
+            persist_directory=str(self._chroma_dir),
+            collection_name="vidhi_cases",
+            hnsw_m=config.hnsw_m,
+            hnsw_ef_construction=config.hnsw_ef_construction,
+            hnsw_ef_search=config.hnsw_ef_search,
+        )
 
     @property
     def store(self) -> LangChainVectorStore:
         return self._store
 
+    @cached_property
+    def _fetcher(self) -> SupremeCourtCaseFetcher:
+        # Deferred so BeautifulSoup is only imported when a public refresh actually runs.
+        from .case_fetcher import SupremeCourtCaseFetcher
+
+        return SupremeCourtCaseFetcher()
+
     def bootstrap_from_local_files(self, max_records: int = 2000) -> Dict[str, Any]:
         if self._store.has_documents():
             return {"loaded": 0, "source": "existing_vector_store"}
@@ -31,7 +50,7 @@ class KnowledgeIngestionPipeline:
         loaded_cases: List[Dict[str, Any]] = []
         for file_path in sorted(self._court_cases_dir.glob("authentic_cases_*.json"), reverse=True):
             try:
-                raw = json.loads(file_path.read_text(encoding="utf-8"))
+                raw = loads(file_path.read_bytes())
             except Exception:
                 continue
 
@@ -47,22 +66,28 @@ class KnowledgeIngestionPipeline:
             if len(loaded_cases) >= max_records:
                 break
 
-        chunks = self._store.add_cases(loaded_cases)
-        return {"loaded": len(loaded_cases), "chunks": chunks, "source": "local_json"}
+        indexed = self._store.index_cases(loaded_cases)
+        return {"loaded": len(loaded_cases), **indexed, "source": "local_json"}
 
     async def refresh_from_public_sources(self, years: int = 5, limit: int = 200) -> Dict[str, Any]:
         cases = await self._fetcher.fetch_recent_cases(years=years, limit=limit)
         if not cases:
-            return {"fetched": 0, "chunks": 0, "saved": ""}
+            return {"fetched": 0, "chunks": 0, "unchanged": 0, "saved": ""}
 
         timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
         path = self._court_cases_dir / f"authentic_cases_{timestamp}.json"
-        path.write_text(json.dumps(cases, indent=2, ensure_ascii=False), encoding="utf-8")
+        # Write beside the target and rename so bootstrap never reads a half-written snapshot.
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(dumps_bytes(cases, indent=True))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
 
-        chunks = self._store.add_cases(cases)
+        indexed = await asyncio.to_thread(self._store.index_cases, cases)
         return {
             "fetched": len(cases),
-            "chunks": chunks,
+            **indexed,
             "saved": str(path),
             "source": "sci.gov.in",
             "windowYears": years,
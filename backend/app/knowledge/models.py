@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class KnowledgeDocument:
     id: str
     title: str
@@ -19,7 +19,7 @@ class KnowledgeDocument:
     updated_at: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class KnowledgeSearchResult:
     document: KnowledgeDocument
     relevance_score: float
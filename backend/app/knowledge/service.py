@@ -1,23 +1,86 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import heapq
 import json
 import os
 import re
+import time
 from datetime import UTC, datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
 import httpx
 
+from ..config import AppConfig
 from .ingestion_pipeline import KnowledgeIngestionPipeline
 
+_NON_ALNUM_LOWER_RE = re.compile(r"[^a-z0-9]+")
+_NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_REFERENCE_URL_RE = re.compile(r"reference url:\s*(https?://\S+)", re.IGNORECASE)
+
+
+def _keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern[str]:
+    # Case-insensitive scan in place of lowercasing the whole payload before substring checks.
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
+_PROVISION_KEYWORDS_RE = _keyword_pattern(("section", "article", "act", "code", "ipc", "bns", "crpc", "bnss"))
+
+_PENAL_COURT_SCOPES = frozenset({"indian_penal_courts", "indian-penal-courts", "ipc-courts"})
+_SCOPE_TEXT_FIELDS = ("title", "category", "summary", "content")
+_VERDICT_TEXT_FIELDS = ("title", "summary", "content")
+_PROVISION_TEXT_FIELDS = ("title", "summary", "content")
+
+
+def _payload_text(item: Dict[str, Any], fields: tuple[str, ...]) -> str:
+    return " ".join([str(item.get(field) or "") for field in fields])
+
+
+def _normalize_line_key(line: str) -> str:
+    return _NON_ALNUM_LOWER_RE.sub("", line.lower())
+
+
+# The same stored chunks come back across queries, so their cleaned text is memoized.
+@lru_cache(maxsize=1024)
+def _sanitize_content_cached(title: str, summary: str, content: str) -> str:
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    if not lines:
+        return content.strip()
+
+    title_key = _normalize_line_key(title)
+    summary_key = _normalize_line_key(summary)
+    seen = set()
+    cleaned_lines: List[str] = []
+
+    for raw_line in lines:
+        normalized_spaces = _WHITESPACE_RE.sub(" ", raw_line).strip()
+        line_key = _normalize_line_key(normalized_spaces)
+        if not line_key:
+            continue
+
+        if line_key in seen:
+            continue
+
+        if line_key in {title_key, summary_key} and line_key in seen:
+            continue
+
+        seen.add(line_key)
+        cleaned_lines.append(normalized_spaces)
+
+    return "\n\n".join(cleaned_lines)
+
 
 class KnowledgeService:
-    def __init__(self, root_dir: Path):
-        self._pipeline = KnowledgeIngestionPipeline(root_dir=root_dir)
+    def __init__(self, root_dir: Path, config: Optional[AppConfig] = None):
+        self._pipeline = KnowledgeIngestionPipeline(root_dir=root_dir, config=config)
         self._seed_documents_path = root_dir / "backend" / "data" / "knowledge" / "seed_documents.json"
+        self._seed_provisions_cache: Optional[tuple[tuple[int, int], List[tuple[str, Dict[str, Any]]]]] = None
         self._pipeline.bootstrap_from_local_files()
         self._auto_refresh_on_empty = os.getenv("VIDHI_AUTO_REFRESH_PUBLIC_CASES", "true").strip().lower() in {
             "1",
@@ -27,6 +90,7 @@ class KnowledgeService:
         self._did_auto_refresh = False
 
         self._kb_scope = os.getenv("VIDHI_KB_SCOPE", "indian_penal_courts").strip().lower()
+        self._penal_scope = self._kb_scope in _PENAL_COURT_SCOPES
         self._rag_mode = os.getenv("VIDHI_RAG_MODE", "regressive").strip().lower()
         self._local_min_results = int(os.getenv("VIDHI_LOCAL_MIN_RESULTS", "3"))
         self._local_min_top_score = float(os.getenv("VIDHI_LOCAL_MIN_TOP_SCORE", "0.08"))
@@ -45,6 +109,12 @@ class KnowledgeService:
             if endpoint.strip()
         ]
         self._external_timeout_s = float(os.getenv("VIDHI_EXTERNAL_KNOWLEDGE_TIMEOUT_S", "8"))
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._live_search_cache_ttl_s = max(0, int(os.getenv("VIDHI_LIVE_SEARCH_CACHE_TTL_S", "300")))
+        self._live_search_cache_max_entries = 256
+        self._live_search_cache: Dict[tuple[str, str, int], tuple[float, List[Dict[str, Any]]]] = {}
+        self._live_search_inflight: Dict[tuple[str, str, int], asyncio.Future] = {}
         self._india_keywords = ("india", "indian")
         self._penal_keywords = (
             "ipc",
@@ -59,6 +129,9 @@ class KnowledgeService:
             "offense",
         )
         self._court_keywords = ("court", "judgment", "judgement", "case", "precedent")
+        self._india_keywords_re = _keyword_pattern(self._india_keywords)
+        self._penal_keywords_re = _keyword_pattern(self._penal_keywords)
+        self._court_keywords_re = _keyword_pattern(self._court_keywords)
         self._verdict_only = os.getenv("VIDHI_VERDICT_ONLY", "true").strip().lower() in {"1", "true", "yes"}
         self._verdict_keywords = (
             "judgment",
@@ -73,11 +146,15 @@ class KnowledgeService:
             "final order",
             "type=j",
         )
+        self._verdict_keywords_re = _keyword_pattern(self._verdict_keywords)
 
     async def search(self, query: str, limit: int = 12) -> List[Dict[str, Any]]:
+        # Blank queries would still embed, possibly auto-refresh, and fall back to the web; skip all of it.
+        if not query.strip():
+            return []
         local_results = [
             item
-            for item in self._pipeline.store.similarity_search(query=query, limit=limit)
+            for item in await self._similarity_search(query=query, limit=limit)
             if self._is_allowed_payload(item)
         ]
         if not local_results and self._auto_refresh_on_empty and not self._did_auto_refresh:
@@ -85,52 +162,46 @@ class KnowledgeService:
             await self.refresh_public_cases(years=5, limit=200)
             local_results = [
                 item
-                for item in self._pipeline.store.similarity_search(query=query, limit=limit)
+                for item in await self._similarity_search(query=query, limit=limit)
                 if self._is_allowed_payload(item)
             ]
 
-        merged = [
-            {
-                "id": item.get("id"),
-                "title": item.get("title"),
-                "category": item.get("category"),
-                "summary": item.get("summary"),
-                "content": item.get("content"),
-            }
-            for item in local_results
-        ]
-
+        # Result lists are chained as-is; the cleaned dict below is the only copy built per item.
+        candidate_lists: List[List[Dict[str, Any]]] = [local_results]
         if self._should_fallback(local_results=local_results, limit=limit):
-            web_results = await self._search_web(query=query, limit=limit)
-            merged.extend(web_results)
-
             if self._external_endpoints:
-                external_results = await self._search_external(query=query, limit=limit)
-                merged.extend(external_results)
+                candidate_lists.extend(
+                    await asyncio.gather(
+                        self._search_web(query=query, limit=limit),
+                        self._search_external(query=query, limit=limit),
+                    )
+                )
+            else:
+                candidate_lists.append(await self._search_web(query=query, limit=limit))
 
         deduped: List[Dict[str, Any]] = []
         seen = set()
-        for item in merged:
+        # Bound once per call rather than looked up on self for every candidate.
+        is_allowed = self._is_allowed_payload
+        has_verdict = self._has_verdict_payload if self._verdict_only else None
+        for item in chain.from_iterable(candidate_lists):
+            title = str(item.get("title") or "")
+            summary = str(item.get("summary") or "")
+            cleaned_title = title.strip()
+            cleaned_content = _sanitize_content_cached(title, summary, str(item.get("content") or ""))
             cleaned = {
                 "id": item.get("id"),
-                "title": str(item.get("title") or "").strip(),
+                "title": cleaned_title,
                 "category": str(item.get("category") or "").strip(),
-                "summary": str(item.get("summary") or "").strip(),
-                "content": self._sanitize_content(
-                    title=str(item.get("title") or ""),
-                    summary=str(item.get("summary") or ""),
-                    content=str(item.get("content") or ""),
-                ),
+                "summary": summary.strip(),
+                "content": cleaned_content,
             }
-            if not self._is_allowed_payload(cleaned):
+            if not is_allowed(cleaned):
                 continue
-            if self._verdict_only and not self._has_verdict_payload(cleaned):
+            if has_verdict is not None and not has_verdict(cleaned):
                 continue
 
-            key = (
-                cleaned.get("title", "").strip().lower(),
-                cleaned.get("content", "").strip()[:240].lower(),
-            )
+            key = (cleaned_title.lower(), cleaned_content.strip()[:240].lower())
             if key in seen:
                 continue
             seen.add(key)
@@ -140,40 +211,52 @@ class KnowledgeService:
 
         return deduped
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        # One pooled client per event loop keeps connections to search APIs and endpoints alive across calls.
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._http_client.is_closed or self._http_client_loop is not loop:
+            self._http_client = httpx.AsyncClient(
+                timeout=self._external_timeout_s,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+            self._http_client_loop = loop
+        return self._http_client
+
+    async def aclose(self) -> None:
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+
+    async def _similarity_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        # Chroma queries and hash embeddings are blocking; keep them off the event loop.
+        return await asyncio.to_thread(self._pipeline.store.similarity_search, query=query, limit=limit)
+
     async def search_provisions(self, query: str, limit: int = 12) -> List[Dict[str, Any]]:
-        raw_results = self._pipeline.store.similarity_search(query=query, limit=max(limit * 4, limit, 1))
+        if not query.strip():
+            return []
+        raw_results = await self._similarity_search(query=query, limit=max(limit * 4, limit, 1))
         if not raw_results and self._auto_refresh_on_empty and not self._did_auto_refresh:
             self._did_auto_refresh = True
             await self.refresh_public_cases(years=5, limit=200)
-            raw_results = self._pipeline.store.similarity_search(query=query, limit=max(limit * 4, limit, 1))
+            raw_results = await self._similarity_search(query=query, limit=max(limit * 4, limit, 1))
 
         filtered: List[Dict[str, Any]] = []
         seen = set()
         for item in raw_results:
             category = str(item.get("category") or "").strip().lower()
-            corpus = " ".join(
-                [
-                    str(item.get("title") or ""),
-                    str(item.get("summary") or ""),
-                    str(item.get("content") or ""),
-                ]
-            ).lower()
-            is_provision = category in {"provision", "statute"} or any(
-                keyword in corpus for keyword in ("section", "article", "act", "code", "ipc", "bns", "crpc", "bnss")
+            is_provision = category in {"provision", "statute"} or bool(
+                _PROVISION_KEYWORDS_RE.search(_payload_text(item, _PROVISION_TEXT_FIELDS))
             )
             if not is_provision:
                 continue
 
+            title = str(item.get("title") or "")
+            summary = str(item.get("summary") or "")
             cleaned = {
                 "id": item.get("id"),
-                "title": str(item.get("title") or "").strip(),
+                "title": title.strip(),
                 "category": str(item.get("category") or "").strip(),
-                "summary": str(item.get("summary") or "").strip(),
-                "content": self._sanitize_content(
-                    title=str(item.get("title") or ""),
-                    summary=str(item.get("summary") or ""),
-                    content=str(item.get("content") or ""),
-                ),
+                "summary": summary.strip(),
+                "content": _sanitize_content_cached(title, summary, str(item.get("content") or "")),
                 "source_url": str(item.get("source_url") or "").strip(),
             }
 
@@ -190,81 +273,81 @@ class KnowledgeService:
 
         return filtered
 
-    def search_seed_provisions(self, query: str, limit: int = 12) -> List[Dict[str, Any]]:
+    def _load_seed_provisions(self) -> List[tuple[str, Dict[str, Any]]]:
+        # Parsed rows and their lowercase search corpus are reused until the seed file changes.
         try:
-            if not self._seed_documents_path.exists():
-                return []
-            raw = self._seed_documents_path.read_text(encoding="utf-8")
-            data = json.loads(raw)
+            stat = self._seed_documents_path.stat()
+        except OSError:
+            return []
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._seed_provisions_cache
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        try:
+            data = json.loads(self._seed_documents_path.read_text(encoding="utf-8"))
         except Exception:
             return []
 
-        if not isinstance(data, list):
+        rows: List[tuple[str, Dict[str, Any]]] = []
+        if isinstance(data, list):
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                category = str(item.get("category") or "").strip().lower()
+                if category not in {"provision", "statute"}:
+                    continue
+
+                corpus = " ".join(
+                    [
+                        str(item.get("title") or ""),
+                        str(item.get("summary") or ""),
+                        str(item.get("text") or ""),
+                        " ".join([str(tag) for tag in (item.get("tags") or []) if isinstance(tag, (str, int, float))]),
+                    ]
+                ).lower()
+                rows.append(
+                    (
+                        corpus,
+                        {
+                            "id": str(item.get("id") or ""),
+                            "title": str(item.get("title") or "").strip(),
+                            "category": str(item.get("category") or "").strip(),
+                            "summary": str(item.get("summary") or "").strip(),
+                            "content": str(item.get("text") or "").strip(),
+                            "source_url": str(item.get("source_url") or "").strip(),
+                        },
+                    )
+                )
+
+        self._seed_provisions_cache = (signature, rows)
+        return rows
+
+    def search_seed_provisions(self, query: str, limit: int = 12) -> List[Dict[str, Any]]:
+        rows = self._load_seed_provisions()
+        if not rows:
             return []
 
-        tokens = [token.lower() for token in re.split(r"[^a-zA-Z0-9]+", query or "") if token]
+        tokens = [token.lower() for token in _NON_ALNUM_RE.split(query or "") if token]
         if not tokens:
             tokens = [str(query or "").lower().strip()] if str(query or "").strip() else []
 
-        scored: List[Dict[str, Any]] = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            category = str(item.get("category") or "").strip().lower()
-            if category not in {"provision", "statute"}:
-                continue
-
-            corpus = " ".join(
-                [
-                    str(item.get("title") or ""),
-                    str(item.get("summary") or ""),
-                    str(item.get("text") or ""),
-                    " ".join([str(tag) for tag in (item.get("tags") or []) if isinstance(tag, (str, int, float))]),
-                ]
-            ).lower()
-
-            score = 0
-            for token in tokens:
-                if token and token in corpus:
-                    score += 1
+        # Rank on plain (score, title length, position) tuples; result dicts are only built for the rows returned.
+        ranked: List[tuple[int, int, int]] = []
+        for position, (corpus, row) in enumerate(rows):
+            score = sum(1 for token in tokens if token in corpus)
             if score == 0 and tokens:
                 continue
+            ranked.append((-score, len(row["title"]), position))
 
-            scored.append(
-                {
-                    "score": score,
-                    "id": str(item.get("id") or ""),
-                    "title": str(item.get("title") or "").strip(),
-                    "category": str(item.get("category") or "").strip(),
-                    "summary": str(item.get("summary") or "").strip(),
-                    "content": str(item.get("text") or "").strip(),
-                    "source_url": str(item.get("source_url") or "").strip(),
-                }
-            )
-
-        scored.sort(key=lambda row: (-int(row.get("score") or 0), len(str(row.get("title") or ""))))
-        if scored:
-            return scored[: max(1, limit)]
+        if ranked:
+            return [
+                {"score": -neg_score, **rows[position][1]}
+                for neg_score, _, position in heapq.nsmallest(max(1, limit), ranked)
+            ]
 
         # deterministic baseline fallback when query tokens do not match seed text
-        baseline: List[Dict[str, Any]] = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            category = str(item.get("category") or "").strip().lower()
-            if category not in {"provision", "statute"}:
-                continue
-            baseline.append(
-                {
-                    "id": str(item.get("id") or ""),
-                    "title": str(item.get("title") or "").strip(),
-                    "category": str(item.get("category") or "").strip(),
-                    "summary": str(item.get("summary") or "").strip(),
-                    "content": str(item.get("text") or "").strip(),
-                    "source_url": str(item.get("source_url") or "").strip(),
-                }
-            )
-        return baseline[: max(1, limit)]
+        return [dict(row) for _, row in rows[: max(1, limit)]]
 
     async def refresh_public_cases(self, years: int = 5, limit: int = 200) -> Dict[str, Any]:
         return await self._pipeline.refresh_from_public_sources(years=years, limit=limit)
@@ -280,78 +363,34 @@ class KnowledgeService:
         return len(local_results) < minimum_expected and top_score < self._local_min_top_score
 
     def _is_allowed_payload(self, item: Dict[str, Any]) -> bool:
-        corpus = " ".join(
-            [
-                str(item.get("title") or ""),
-                str(item.get("category") or ""),
-                str(item.get("summary") or ""),
-                str(item.get("content") or ""),
-            ]
-        )
-        return self._matches_scope(corpus)
+        return self._matches_scope(_payload_text(item, _SCOPE_TEXT_FIELDS))
 
     def _matches_scope(self, raw_text: str) -> bool:
-        if self._kb_scope not in {"indian_penal_courts", "indian-penal-courts", "ipc-courts"}:
+        if not self._penal_scope:
             return True
 
-        text = raw_text.lower()
-        in_india = any(keyword in text for keyword in self._india_keywords)
-        in_penal_domain = any(keyword in text for keyword in self._penal_keywords)
-        in_court_context = any(keyword in text for keyword in self._court_keywords)
-        return in_india and in_penal_domain and in_court_context
+        # One C-level scan per keyword group, stopping at the first group that is absent.
+        return bool(
+            self._india_keywords_re.search(raw_text)
+            and self._penal_keywords_re.search(raw_text)
+            and self._court_keywords_re.search(raw_text)
+        )
 
     def _scoped_query(self, query: str) -> str:
-        if self._kb_scope in {"indian_penal_courts", "indian-penal-courts", "ipc-courts"}:
+        if self._penal_scope:
             return f"{query.strip()} Indian penal criminal court judgment"
         return query
 
-    @staticmethod
-    def _normalize_line_key(line: str) -> str:
-        return re.sub(r"[^a-z0-9]+", "", line.lower())
-
-    def _sanitize_content(self, title: str, summary: str, content: str) -> str:
-        lines = [line.strip() for line in content.splitlines() if line.strip()]
-        if not lines:
-            return content.strip()
-
-        title_key = self._normalize_line_key(title)
-        summary_key = self._normalize_line_key(summary)
-        seen = set()
-        cleaned_lines: List[str] = []
-
-        for raw_line in lines:
-            normalized_spaces = re.sub(r"\s+", " ", raw_line).strip()
-            line_key = self._normalize_line_key(normalized_spaces)
-            if not line_key:
-                continue
-
-            if line_key in seen:
-                continue
-
-            if line_key in {title_key, summary_key} and line_key in seen:
-                continue
-
-            seen.add(line_key)
-            cleaned_lines.append(normalized_spaces)
-
-        return "\n\n".join(cleaned_lines)
-
     def _has_verdict_payload(self, item: Dict[str, Any]) -> bool:
-        text = " ".join(
-            [
-                str(item.get("title") or ""),
-                str(item.get("summary") or ""),
-                str(item.get("content") or ""),
-            ]
-        ).lower()
-        if any(keyword in text for keyword in self._verdict_keywords):
+        text = _payload_text(item, _VERDICT_TEXT_FIELDS)
+        if self._verdict_keywords_re.search(text):
             return True
 
-        match = re.search(r"reference url:\s*(https?://\S+)", text, flags=re.IGNORECASE)
+        match = _REFERENCE_URL_RE.search(text)
         if not match:
             return False
 
-        url = match.group(1)
+        url = match.group(1).lower()
         parsed = urlparse(url)
         query = parse_qs(parsed.query)
         link_type = (query.get("type", [""])[0] or "").lower()
@@ -380,8 +419,7 @@ class KnowledgeService:
                 "gl": self._web_search_country.lower(),
                 "hl": self._web_search_language,
             }
-            async with httpx.AsyncClient(timeout=self._external_timeout_s) as client:
-                response = await client.get("https://www.searchapi.io/api/v1/search", params=params)
+            response = await self._get_http_client().get("https://www.searchapi.io/api/v1/search", params=params)
             if response.status_code >= 300:
                 return []
             data = response.json()
@@ -423,49 +461,62 @@ class KnowledgeService:
         return out
 
     async def _search_external(self, query: str, limit: int) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
         scoped_query = self._scoped_query(query)
-        for endpoint in self._external_endpoints:
-            try:
-                async with httpx.AsyncClient(timeout=self._external_timeout_s) as client:
-                    response = await client.get(endpoint, params={"q": scoped_query, "limit": limit})
-                if response.status_code >= 300:
-                    continue
+        # Endpoints are queried concurrently over the shared client; results keep the configured endpoint order.
+        client = self._get_http_client()
+        per_endpoint = await asyncio.gather(
+            *(
+                self._search_external_endpoint(client, endpoint, scoped_query, limit)
+                for endpoint in self._external_endpoints
+            )
+        )
+        return list(chain.from_iterable(per_endpoint))
 
-                payload = response.json()
-                items = payload if isinstance(payload, list) else payload.get("items", [])
-                if not isinstance(items, list):
-                    continue
+    async def _search_external_endpoint(
+        self, client: httpx.AsyncClient, endpoint: str, scoped_query: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        try:
+            response = await client.get(endpoint, params={"q": scoped_query, "limit": limit})
+            if response.status_code >= 300:
+                return out
 
-                for idx, item in enumerate(items):
-                    if not isinstance(item, dict):
-                        continue
+            payload = response.json()
+            items = payload if isinstance(payload, list) else payload.get("items", [])
+            if not isinstance(items, list):
+                return out
 
-                    source_name = str(item.get("source_name") or item.get("source") or "External Knowledge API")
-                    source_url = str(item.get("source_url") or item.get("url") or endpoint)
-                    out.append(
-                        {
-                            "id": str(item.get("id") or f"external-{idx}-{source_name}"),
-                            "title": str(item.get("title") or "Legal reference"),
-                            "category": str(item.get("category") or "external-reference"),
-                            "summary": str(item.get("summary") or "Reference returned by external knowledge source."),
-                            "content": "\n\n".join(
-                                [
-                                    str(item.get("content") or item.get("text") or ""),
-                                    f"Source: {source_name}",
-                                    f"Reference URL: {source_url}",
-                                ]
-                            ).strip(),
-                        }
-                    )
-            except Exception:
-                continue
+            for idx, item in enumerate(items):
+                if not isinstance(item, dict):
+                    continue
+
+                source_name = str(item.get("source_name") or item.get("source") or "External Knowledge API")
+                source_url = str(item.get("source_url") or item.get("url") or endpoint)
+                out.append(
+                    {
+                        "id": str(item.get("id") or f"external-{idx}-{source_name}"),
+                        "title": str(item.get("title") or "Legal reference"),
+                        "category": str(item.get("category") or "external-reference"),
+                        "summary": str(item.get("summary") or "Reference returned by external knowledge source."),
+                        "content": "\n\n".join(
+                            [
+                                str(item.get("content") or item.get("text") or ""),
+                                f"Source: {source_name}",
+                                f"Reference URL: {source_url}",
+                            ]
+                        ).strip(),
+                    }
+                )
+        except Exception:
+            pass
         return out
 
 
 
 
     async def live_web_search(self, query: str, limit: int = 10, intent: str = "case_law") -> List[Dict[str, Any]]:
+        if not query.strip():
+            return []
         normalized_intent = (intent or "case_law").strip().lower()
         if normalized_intent not in {"case_law", "provision"}:
             normalized_intent = "case_law"
@@ -475,6 +526,22 @@ class KnowledgeService:
             return []
 
         engine_query = self._build_live_query(query=query, intent=normalized_intent)
+        cache_key = (normalized_intent, engine_query, limit)
+        cached = self._live_search_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._last_web_error = ""
+            return [dict(item) for item in cached[1]]
+
+        # Identical concurrent searches share one SearchAPI request; each caller still gets its own copies.
+        pending = self._live_search_inflight.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_live_results(engine_query, normalized_intent, limit))
+            self._live_search_inflight[cache_key] = pending
+            pending.add_done_callback(lambda _done, key=cache_key: self._live_search_inflight.pop(key, None))
+        results = await asyncio.shield(pending)
+        return [dict(item) for item in results]
+
+    async def _fetch_live_results(self, engine_query: str, normalized_intent: str, limit: int) -> List[Dict[str, Any]]:
         try:
             params = {
                 "api_key": self._searchapi_api_key,
@@ -484,8 +551,7 @@ class KnowledgeService:
                 "gl": self._web_search_country.lower(),
                 "hl": self._web_search_language,
             }
-            async with httpx.AsyncClient(timeout=self._external_timeout_s) as client:
-                response = await client.get("https://www.searchapi.io/api/v1/search", params=params)
+            response = await self._get_http_client().get("https://www.searchapi.io/api/v1/search", params=params)
             if response.status_code >= 300:
                 self._last_web_error = f"searchapi HTTP {response.status_code}: {response.text[:180]}"
                 return []
@@ -530,6 +596,13 @@ class KnowledgeService:
                 break
 
         self._last_web_error = ""
+        if self._live_search_cache_ttl_s:
+            if len(self._live_search_cache) >= self._live_search_cache_max_entries:
+                self._live_search_cache.pop(next(iter(self._live_search_cache)))
+            self._live_search_cache[(normalized_intent, engine_query, limit)] = (
+                time.monotonic() + self._live_search_cache_ttl_s,
+                out,
+            )
         return out
 
     def get_last_web_error(self) -> str:
@@ -580,23 +653,31 @@ class KnowledgeService:
 
     def clear_cached_provision_results(self) -> int:
         deleted_searchapi = self._pipeline.store.delete_by_metadata({"source_name": "SearchApi.io (Google)", "category": "provision"})
+        # Drop memoized live provision searches too, or hybrid search keeps serving them until their TTL lapses.
+        for cache_key in [key for key in list(self._live_search_cache) if key[0] == "provision"]:
+            self._live_search_cache.pop(cache_key, None)
         return deleted_searchapi
 
     async def hybrid_provision_search(self, query: str, limit: int = 12, web_limit: int = 12) -> List[Dict[str, Any]]:
-        local_results = await self.search_provisions(query=query, limit=max(limit, 1))
-        web_results = await self.live_web_search(query=query, limit=max(web_limit, 1), intent="provision")
+        if not query.strip():
+            return []
+        local_results, web_results = await asyncio.gather(
+            self.search_provisions(query=query, limit=max(limit, 1)),
+            self.live_web_search(query=query, limit=max(web_limit, 1), intent="provision"),
+        )
 
         if not local_results and web_results:
-            self.cache_live_provision_results(web_results)
+            await asyncio.to_thread(self.cache_live_provision_results, web_results)
             local_results = await self.search_provisions(query=query, limit=max(limit, 1))
 
         combined: List[Dict[str, Any]] = []
         seen = set()
 
+        # Mapped rows below are already stripped strings with a lowercase source tag.
         def key_for(item: Dict[str, Any]) -> str:
-            url = str(item.get("url") or item.get("source_url") or "").strip().lower()
-            title = str(item.get("title") or "").strip().lower()
-            source = str(item.get("source") or "").strip().lower()
+            url = item["url"].lower()
+            title = item["title"].lower()
+            source = item["source"]
             if url:
                 parsed = urlparse(url)
                 path = (parsed.path or "").strip()
@@ -606,6 +687,12 @@ class KnowledgeService:
                 return f"url::{url}::{source}"
             return f"title::{title}::{source}"
 
+        def take(item: Dict[str, Any]) -> None:
+            k = key_for(item)
+            if k not in seen:
+                seen.add(k)
+                combined.append(item)
+
         local_mapped = [
             {
                 "id": str(item.get("id") or ""),
@@ -634,29 +721,17 @@ class KnowledgeService:
 
         local_quota = max(1, limit // 2) if local_mapped and web_mapped else limit
         for item in local_mapped[:local_quota]:
-            k = key_for(item)
-            if k in seen:
-                continue
-            seen.add(k)
-            combined.append(item)
+            take(item)
 
         for item in web_mapped:
             if len(combined) >= limit:
                 break
-            k = key_for(item)
-            if k in seen:
-                continue
-            seen.add(k)
-            combined.append(item)
+            take(item)
 
         for item in local_mapped[local_quota:]:
             if len(combined) >= limit:
                 break
-            k = key_for(item)
-            if k in seen:
-                continue
-            seen.add(k)
-            combined.append(item)
+            take(item)
 
         if not combined:
             seed = self.search_seed_provisions(query=query, limit=limit)
@@ -670,11 +745,7 @@ class KnowledgeService:
                     "publishedAt": "",
                     "source": "local-kb",
                 }
-                k = key_for(mapped)
-                if k in seen:
-                    continue
-                seen.add(k)
-                combined.append(mapped)
+                take(mapped)
                 if len(combined) >= limit:
                     break
 
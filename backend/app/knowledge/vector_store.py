@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import re
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, List, Set
 
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
@@ -10,27 +10,71 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from .embeddings import HashEmbeddings
 
+_LINE_BREAK_RE = re.compile(r"[\r\n]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class LangChainVectorStore:
-    def __init__(self, persist_directory: str, collection_name: str = "vidhi_cases"):
+    def __init__(
+        self,
+        persist_directory: str,
+        collection_name: str = "vidhi_cases",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 100,
+        add_batch_size: int = 512,
+    ):
         self._splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=120)
+        self._embeddings = HashEmbeddings()
+        self._add_batch_size = max(1, int(add_batch_size))
+        # Graph shape (M, ef_construction) only applies when the collection is created; ef_search can be retuned later.
         self._store = Chroma(
             collection_name=collection_name,
             persist_directory=persist_directory,
-            embedding_function=HashEmbeddings(),
+            embedding_function=self._embeddings,
+            collection_configuration={
+                "hnsw": {
+                    "max_neighbors": hnsw_m,
+                    "ef_construction": hnsw_ef_construction,
+                    "ef_search": hnsw_ef_search,
+                }
+            },
         )
+        self._apply_ef_search(hnsw_ef_search)
+
+    def _apply_ef_search(self, ef_search: int) -> None:
+        collection = self._store._collection
+        current = (collection.configuration or {}).get("hnsw") or {}
+        if current.get("ef_search") != ef_search:
+            collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
 
     def similarity_search(self, query: str, limit: int = 12) -> List[Dict[str, Any]]:
-        if not query.strip():
-            return []
+        return self.similarity_search_batch([query], limit=limit)[0]
+
+    def similarity_search_batch(self, queries: List[str], limit: int = 12) -> List[List[Dict[str, Any]]]:
+        # All non-blank queries go to the collection in one call; results keep the input order.
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        active = [idx for idx, query in enumerate(queries) if query.strip()]
+        if not active:
+            return results
+
+        raw = self._store._collection.query(
+            query_embeddings=[self._embeddings.embed_query(queries[idx]) for idx in active],
+            n_results=max(limit * 4, limit, 1),
+            include=["documents", "metadatas", "distances"],
+        )
+        for idx, documents, metadatas, distances in zip(active, raw["documents"], raw["metadatas"], raw["distances"]):
+            results[idx] = self._to_results(zip(documents, metadatas, distances), limit)
+        return results
 
-        rows = self._store.similarity_search_with_score(query=query, k=max(limit * 4, limit, 1))
+    def _to_results(self, rows: Iterable[tuple[str, Any, float]], limit: int) -> List[Dict[str, Any]]:
         out: List[Dict[str, Any]] = []
         seen_case_ids: Set[str] = set()
 
-        for doc, distance in rows:
-            metadata = doc.metadata or {}
-            case_id = str(metadata.get("case_id") or self._stable_id(doc.page_content))
+        for content, raw_metadata, distance in rows:
+            metadata = raw_metadata or {}
+            content = content or ""
+            case_id = str(metadata.get("case_id") or self._stable_id(content))
             if case_id in seen_case_ids:
                 continue
             seen_case_ids.add(case_id)
@@ -42,7 +86,7 @@ class LangChainVectorStore:
                     "title": str(metadata.get("title") or "Case law reference"),
                     "category": str(metadata.get("category") or "Criminal Law"),
                     "summary": str(metadata.get("summary") or "Relevant case law chunk."),
-                    "content": doc.page_content,
+                    "content": content,
                     "score": score,
                     "source_url": str(metadata.get("source_url") or ""),
                     "updated_at": str(metadata.get("updated_at") or ""),
@@ -54,11 +98,14 @@ class LangChainVectorStore:
         return out
 
     def add_cases(self, cases: List[Dict[str, Any]]) -> int:
+        return self.index_cases(cases)["chunks"]
+
+    def index_cases(self, cases: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Index cases and report chunks written plus cases skipped because their content is unchanged."""
         if not cases:
-            return 0
+            return {"chunks": 0, "unchanged": 0}
 
-        docs: List[Document] = []
-        ids: List[str] = []
+        prepared: List[tuple[str, str, Dict[str, Any]]] = []
         for case in cases:
             title = str(case.get("title") or "Case law reference").strip()
             summary = str(case.get("summary") or "").strip()
@@ -74,12 +121,6 @@ class LangChainVectorStore:
             if not isinstance(tags, list):
                 tags = []
 
-            # Replace previous chunks of the same case to avoid stale duplicated content.
-            try:
-                self._store.delete(where={"case_id": case_id})
-            except Exception:
-                pass
-
             main_text = self._clean_main_text(body or summary or title)
             canonical_text = "\n\n".join(
                 [
@@ -92,30 +133,66 @@ class LangChainVectorStore:
                     f"Tags: {', '.join([str(tag) for tag in tags])}",
                 ]
             ).strip()
+            metadata = {
+                "case_id": case_id,
+                "title": title,
+                "summary": summary,
+                "category": category,
+                "source_url": source_url,
+                "source_name": source_name,
+                "updated_at": updated_at,
+                "jurisdiction": jurisdiction,
+                "authority": authority,
+            }
+            metadata["content_hash"] = self._stable_id(
+                "\x00".join([canonical_text, *(f"{key}={metadata[key]}" for key in sorted(metadata))])
+            )
+            prepared.append((case_id, canonical_text, metadata))
 
+        # Cases whose stored chunks already carry the same content hash are left untouched,
+        # so re-bootstrapping the same files does not re-split and re-embed them.
+        stored_hashes = self._stored_content_hashes([case_id for case_id, _, _ in prepared])
+
+        docs: List[Document] = []
+        ids: List[str] = []
+        changed_case_ids: List[str] = []
+        unchanged = 0
+        for case_id, canonical_text, metadata in prepared:
+            if stored_hashes.get(case_id) == metadata["content_hash"]:
+                unchanged += 1
+                continue
+
+            changed_case_ids.append(case_id)
             chunks = self._splitter.split_text(canonical_text)
             for chunk_index, chunk in enumerate(chunks):
-                chunk_id = f"{case_id}-chunk-{chunk_index}"
-                ids.append(chunk_id)
-                docs.append(
-                    Document(
-                        page_content=chunk,
-                        metadata={
-                            "case_id": case_id,
-                            "title": title,
-                            "summary": summary,
-                            "category": category,
-                            "source_url": source_url,
-                            "source_name": source_name,
-                            "updated_at": updated_at,
-                            "jurisdiction": jurisdiction,
-                            "authority": authority,
-                        },
-                    )
-                )
-
-        self._store.add_documents(documents=docs, ids=ids)
-        return len(ids)
+                ids.append(f"{case_id}-chunk-{chunk_index}")
+                docs.append(Document(page_content=chunk, metadata=dict(metadata)))
+
+        # Replace previous chunks of changed cases to avoid stale duplicated content; one delete covers the batch.
+        if changed_case_ids:
+            try:
+                self._store.delete(where={"case_id": {"$in": changed_case_ids}})
+            except Exception:
+                pass
+        # Sized upserts keep each Chroma write (and its SQLite transaction) bounded on large refreshes.
+        for start in range(0, len(docs), self._add_batch_size):
+            end = start + self._add_batch_size
+            self._store.add_documents(documents=docs[start:end], ids=ids[start:end])
+        return {"chunks": len(ids), "unchanged": unchanged}
+
+    def _stored_content_hashes(self, case_ids: List[str]) -> Dict[str, str]:
+        if not case_ids:
+            return {}
+        try:
+            existing = self._store.get(ids=[f"{case_id}-chunk-0" for case_id in case_ids], include=["metadatas"])
+        except Exception:
+            return {}
+
+        hashes: Dict[str, str] = {}
+        for metadata in existing.get("metadatas") or []:
+            if isinstance(metadata, dict) and metadata.get("content_hash"):
+                hashes[str(metadata.get("case_id") or "")] = str(metadata["content_hash"])
+        return hashes
 
     def has_documents(self) -> bool:
         return self._store._collection.count() > 0
@@ -131,11 +208,11 @@ class LangChainVectorStore:
 
     @staticmethod
     def _clean_main_text(text: str) -> str:
-        raw_lines = [line.strip() for line in re.split(r"[\r\n]+", text) if line.strip()]
+        raw_lines = [line.strip() for line in _LINE_BREAK_RE.split(text) if line.strip()]
         deduped_lines: List[str] = []
         seen: Set[str] = set()
         for line in raw_lines:
-            normalized = re.sub(r"\s+", " ", line).strip().lower()
+            normalized = _WHITESPACE_RE.sub(" ", line).strip().lower()
             if not normalized or normalized in seen:
                 continue
             seen.add(normalized)
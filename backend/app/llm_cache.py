@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backend.app.serialization import dumps_bytes, loads
+
+CACHE_SCHEMA_VERSION = "1"
+
+
+class LlmResponseCache:
+    """Content-hash TTL cache for guarded LLM task outputs."""
+
+    def __init__(self, ttl_s: int, max_entries: int) -> None:
+        self._ttl_s = max(1, int(ttl_s))
+        self._max_entries = max(1, int(max_entries))
+        self._lock = Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def build_key(model: str, task: str, system_prompt: str, task_prompt: str, payload: Any) -> str:
+        digest = hashlib.sha256()
+        digest.update(CACHE_SCHEMA_VERSION.encode("utf-8"))
+        for part in (model, task, system_prompt, task_prompt):
+            digest.update(b"\x00")
+            digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(dumps_bytes(payload, sort_keys=True))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None or record[0] < now:
+                if record is not None:
+                    self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            encoded = record[1]
+        return loads(encoded)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        encoded = dumps_bytes(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_s, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+class SemanticResponseCache:
+    """Embedding-similarity cache for near-duplicate LLM task payloads.
+
+    Entries are indexed in random-hyperplane LSH tables, so a lookup only scores entries that share
+    at least one bucket with the query instead of scanning the whole cache. That trades recall for
+    speed: a neighbour above the threshold can land in no shared bucket and be missed. While the
+    cache holds at most ``linear_scan_max_entries`` entries (a quarter of the default capacity),
+    lookups scan every entry instead.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], List[float]],
+        threshold: float,
+        max_entries: int,
+        ttl_s: int = 1800,
+        lsh_tables: int = 8,
+        lsh_bits: int = 8,
+        linear_scan_max_entries: int = 64,
+    ) -> None:
+        self._embed = embed
+        self._threshold = threshold
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_s = max(1, int(ttl_s))
+        self._lsh_tables = max(1, int(lsh_tables))
+        self._lsh_bits = max(1, int(lsh_bits))
+        self._linear_scan_max_entries = max(0, int(linear_scan_max_entries))
+        self._lock = Lock()
+        # entry id -> (namespace, expires_at, vector, encoded output, bucket keys)
+        self._entries: OrderedDict[int, tuple[str, float, tuple[float, ...], bytes, tuple[tuple, ...]]] = OrderedDict()
+        self._buckets: Dict[tuple, set[int]] = {}
+        self._planes: Dict[int, List[List[float]]] = {}
+        self._next_id = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _hyperplanes(self, dimensions: int) -> List[List[float]]:
+        # Seeded so bucket keys are stable for the lifetime of the process and across instances.
+        planes = self._planes.get(dimensions)
+        if planes is None:
+            rng = random.Random(dimensions)
+            planes = [
+                [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+                for _ in range(self._lsh_tables * self._lsh_bits)
+            ]
+            self._planes[dimensions] = planes
+        return planes
+
+    def _bucket_keys(self, namespace: str, vector: Sequence[float]) -> tuple[tuple, ...]:
+        nonzero = [(idx, value) for idx, value in enumerate(vector) if value]
+        bits = [
+            sum(plane[idx] * value for idx, value in nonzero) >= 0
+            for plane in self._hyperplanes(len(vector))
+        ]
+        width = self._lsh_bits
+        return tuple(
+            (table, namespace, len(vector), tuple(bits[table * width : (table + 1) * width]))
+            for table in range(self._lsh_tables)
+        )
+
+    def embed(self, text: str) -> tuple[float, ...]:
+        vector = self._embed(text)
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            return ()
+        return tuple(value / norm for value in vector)
+
+    def get(self, namespace: str, vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        if not vector:
+            return None
+        keys = None if len(self._entries) <= self._linear_scan_max_entries else self._bucket_keys(namespace, vector)
+        now = time.monotonic()
+        best_id = -1
+        best_score = self._threshold
+        with self._lock:
+            candidates: set[int] = set()
+            if keys is None:
+                candidates.update(entry_id for entry_id, entry in self._entries.items() if entry[0] == namespace)
+            else:
+                for key in keys:
+                    candidates.update(self._buckets.get(key, ()))
+            for entry_id in candidates:
+                _, expires_at, entry_vector, _, _ = self._entries[entry_id]
+                if expires_at < now:
+                    self._remove_locked(entry_id)
+                    continue
+                if len(entry_vector) != len(vector):
+                    continue
+                score = sum(a * b for a, b in zip(entry_vector, vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id < 0:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self._hits += 1
+            encoded = self._entries[best_id][3]
+        return loads(encoded)
+
+    def set(self, namespace: str, vector: Sequence[float], value: Dict[str, Any]) -> None:
+        if not vector:
+            return
+        encoded = dumps_bytes(value)
+        keys = self._bucket_keys(namespace, vector)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (namespace, time.monotonic() + self._ttl_s, tuple(vector), encoded, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self._max_entries:
+                self._remove_locked(next(iter(self._entries)))
+
+    def _remove_locked(self, entry_id: int) -> None:
+        for key in self._entries.pop(entry_id)[4]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
@@ -1,26 +1,44 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from backend.app.serialization import dumps
+
+# Set once per request by the request middleware; copied into tasks the request spawns.
+REQUEST_ID: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = REQUEST_ID.get()
+        return True
 
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload: Dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
 
         structured_fields = getattr(record, "structured_fields", None)
         if isinstance(structured_fields, dict):
             payload.update(structured_fields)
 
-        return json.dumps(payload, ensure_ascii=False)
+        # Tracebacks are rendered here, once, and only for records that carry one.
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+
+        return dumps(payload)
 
 
 def configure_logging() -> None:
@@ -33,6 +51,7 @@ def configure_logging() -> None:
 
     handler = logging.StreamHandler()
     handler.setFormatter(JsonFormatter())
+    handler.addFilter(RequestIdFilter())
 
     root.handlers.clear()
     root.addHandler(handler)
@@ -44,5 +63,10 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
-def log_event(logger: logging.Logger, level: int, message: str, **fields: Any) -> None:
-    logger.log(level, message, extra={"structured_fields": fields})
+def log_event(
+    logger: logging.Logger, level: int, message: str, *args: Any, exc_info: Any = None, **fields: Any
+) -> None:
+    # Skip record construction entirely for disabled levels; %-style args are formatted lazily by the handler.
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, message, *args, exc_info=exc_info, extra={"structured_fields": fields})
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from backend.app.prompts.types import PromptTaskName
 
@@ -25,12 +25,49 @@ TASK_PROMPT_FILES: Dict[PromptTaskName, str] = {
 }
 
 
-def _read_manifest() -> Dict[str, Any]:
-    return json.loads(_MANIFEST_PATH.read_text(encoding="utf-8"))
+_manifest_cache: Optional[Tuple[Tuple[int, int], Dict[str, Any], Dict[PromptTaskName, str]]] = None
+
+
+def _load_manifest() -> Tuple[Dict[str, Any], Dict[PromptTaskName, str]]:
+    # Parse the manifest and derive task versions only when the file changes on disk.
+    global _manifest_cache
+    stat = _MANIFEST_PATH.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _manifest_cache is None or _manifest_cache[0] != stamp:
+        manifest = json.loads(_MANIFEST_PATH.read_text(encoding="utf-8"))
+        _manifest_cache = (stamp, manifest, _task_versions(manifest))
+    return _manifest_cache[1], _manifest_cache[2]
+
+
+def _task_versions(manifest: Dict[str, Any]) -> Dict[PromptTaskName, str]:
+    modules = manifest.get("modules", {})
+    versions: Dict[PromptTaskName, str] = {}
+    for task, file_name in TASK_PROMPT_FILES.items():
+        module = modules.get(task, {})
+        if module.get("file") == file_name:
+            versions[task] = str(module.get("version", "unversioned"))
+            continue
+        versions[task] = "unversioned"
+    return versions
+
+
+_prompt_text_cache: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
+
+def _read_prompt_file(path: Path) -> str:
+    # Prompt text is re-read only when the file changes on disk; a stat is far cheaper than a read per LLM call.
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _prompt_text_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    text = path.read_text(encoding="utf-8").strip()
+    _prompt_text_cache[path] = (stamp, text)
+    return text
 
 
 def read_core_prompt(name: str) -> str:
-    return (_CORE_DIR / name).read_text(encoding="utf-8").strip()
+    return _read_prompt_file(_CORE_DIR / name)
 
 
 def has_task_prompt(task: str) -> bool:
@@ -39,22 +76,14 @@ def has_task_prompt(task: str) -> bool:
 
 def read_task_prompt(task: PromptTaskName) -> str:
     filename = TASK_PROMPT_FILES[task]
-    return (_MODULES_DIR / filename).read_text(encoding="utf-8").strip()
+    return _read_prompt_file(_MODULES_DIR / filename)
 
 
 def get_prompt_manifest_version() -> str:
-    manifest = _read_manifest()
+    manifest, _ = _load_manifest()
     return str(manifest.get("manifestVersion", "unknown"))
 
 
 def get_task_prompt_versions() -> Dict[PromptTaskName, str]:
-    manifest = _read_manifest()
-    modules = manifest.get("modules", {})
-    versions: Dict[PromptTaskName, str] = {}
-    for task, file_name in TASK_PROMPT_FILES.items():
-        module = modules.get(task, {})
-        if module.get("file") == file_name:
-            versions[task] = str(module.get("version", "unversioned"))
-            continue
-        versions[task] = "unversioned"
-    return versions
+    _, versions = _load_manifest()
+    return dict(versions)
@@ -4,14 +4,21 @@ import asyncio
 import time
 import uuid
 from threading import Lock
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 
 class InMemoryTaskQueue:
-    """Simple in-process async queue abstraction for background jobs."""
+    """Simple in-process async queue abstraction for background jobs.
 
-    def __init__(self) -> None:
+    ``max_concurrency`` caps each job kind (the part of the job name before the first ``:``) separately, so a
+    burst of cache warmers cannot hold every slot while interactive analysis jobs wait.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
         self._lock = Lock()
+        self._max_concurrency = max(1, int(max_concurrency)) if max_concurrency else None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
         self._tasks: Dict[str, asyncio.Task[None]] = {}
         self._submitted = 0
         self._completed = 0
@@ -20,9 +27,15 @@ class InMemoryTaskQueue:
     def submit(self, name: str, coro_factory: Callable[[], Awaitable[None]]) -> str:
         job_id = f"{name}:{uuid.uuid4().hex[:12]}"
 
+        semaphore = self._loop_semaphore(name.split(":", 1)[0])
+
         async def _runner() -> None:
             try:
-                await coro_factory()
+                if semaphore is None:
+                    await coro_factory()
+                else:
+                    async with semaphore:
+                        await coro_factory()
                 with self._lock:
                     self._completed += 1
             except Exception:
@@ -39,6 +52,21 @@ class InMemoryTaskQueue:
 
         return job_id
 
+    def _loop_semaphore(self, kind: str) -> Optional[asyncio.Semaphore]:
+        if self._max_concurrency is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Semaphores bind to the first loop that waits on them.
+            if self._semaphore_loop is not loop:
+                self._semaphores = {}
+                self._semaphore_loop = loop
+            semaphore = self._semaphores.get(kind)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self._max_concurrency)
+                self._semaphores[kind] = semaphore
+            return semaphore
+
     def snapshot(self) -> Dict[str, Any]:
         with self._lock:
             return {
@@ -44,6 +44,11 @@ class MetricsRouteStatResponse(BaseModel):
     requests: int
     avgDurationMs: float
 
+class MetricsCacheResponse(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+
 class MetricsResponse(BaseModel):
     status: str
     appVersion: str
@@ -53,6 +58,8 @@ class MetricsResponse(BaseModel):
     totalErrors: int
     statusBuckets: MetricsStatusBucketsResponse
     routes: Dict[str, MetricsRouteStatResponse] = Field(default_factory=dict)
+    llmCache: MetricsCacheResponse
+    llmSemanticCache: Optional[MetricsCacheResponse] = None
 
 class PromptVersionResponse(BaseModel):
     manifestVersion: str
@@ -72,36 +79,6 @@ class KnowledgeSearchItemResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
-class MetricsRouteStatResponse(BaseModel):
-    requests: int
-    avgDurationMs: float
-
-
-class MetricsResponse(BaseModel):
-    status: str
-    appVersion: str
-    processStartTime: str
-    uptimeSeconds: int
-    totalRequests: int
-    totalErrors: int
-    statusBuckets: MetricsStatusBucketsResponse
-    routes: Dict[str, MetricsRouteStatResponse] = Field(default_factory=dict)
-
-class PromptVersionResponse(BaseModel):
-    manifestVersion: str
-    systemPromptStackVersion: str
-    taskPromptVersions: Dict[str, str] = Field(default_factory=dict)
-
-class QueueStatsResponse(BaseModel):
-    timestamp: str
-    submitted: int
-    active: int
-    completed: int
-    failed: int
-
-class KnowledgeSearchItemResponse(BaseModel):
-    model_config = ConfigDict(extra="allow")
-
 class RefreshResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
 
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# orjson decodes integers wider than 64 bits as floats; any run of 19+ digits is left to the stdlib parser.
+_WIDE_INT_BYTES = re.compile(rb"[0-9]{19}")
+_WIDE_INT_STR = re.compile(r"[0-9]{19}")
+
+
+def _has_non_finite_float(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite_float(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite_float(item) for item in value)
+    return False
+
+
+def dumps_bytes(value: Any, *, sort_keys: bool = False, indent: bool = False) -> bytes:
+    if orjson is not None:
+        # Non-str keys are stringified like the stdlib does; values orjson rejects (e.g. ints above 64 bits) fall back to json.
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            encoded = orjson.dumps(value, option=option)
+        except orjson.JSONEncodeError:
+            encoded = None
+        # orjson writes NaN/Infinity as null; only walk the value when the output could hold such a null.
+        if encoded is not None and not (b"null" in encoded and _has_non_finite_float(value)):
+            return encoded
+    return json.dumps(
+        value,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(value: Any, *, sort_keys: bool = False, indent: bool = False) -> str:
+    return dumps_bytes(value, sort_keys=sort_keys, indent=indent).decode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    if orjson is not None:
+        wide_int = _WIDE_INT_STR if isinstance(data, str) else _WIDE_INT_BYTES
+        if wide_int.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN/Infinity tokens written by the stdlib fallback are rejected by orjson.
+                pass
+    return json.loads(data)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from backend.app.prompts.builder import build_system_prompt
-from backend.app.prompts.registry import has_task_prompt, read_task_prompt
+from backend.app.prompts.registry import TASK_PROMPT_FILES, has_task_prompt, read_task_prompt
 
 
 def resolve_system_prompt() -> str:
@@ -15,3 +15,9 @@ def resolve_task_prompt(task_or_prompt: str) -> str:
     if has_task_prompt(text):
         return read_task_prompt(text)  # type: ignore[arg-type]
     return text
+
+
+def warm_prompt_cache() -> None:
+    resolve_system_prompt()
+    for task in TASK_PROMPT_FILES:
+        read_task_prompt(task)
@@ -42,3 +42,26 @@ def test_env_overrides_file_values(tmp_path: Path, monkeypatch) -> None:
     config = load_app_config(tmp_path)
 
     assert config.port == 9200
+
+
+def test_semantic_cache_threshold_is_clamped(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("VIDHI_CONFIG_FILE", raising=False)
+    monkeypatch.setenv("VIDHI_LLM_SEMANTIC_CACHE_THRESHOLD", "1.7")
+
+    config = load_app_config(tmp_path)
+
+    assert config.llm_semantic_cache_enabled is False
+    assert config.llm_semantic_cache_threshold == 1.0
+
+
+def test_hnsw_settings_read_from_env_and_are_clamped(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("VIDHI_CONFIG_FILE", raising=False)
+    monkeypatch.setenv("VIDHI_HNSW_M", "1")
+    monkeypatch.setenv("VIDHI_HNSW_EF_CONSTRUCTION", "400")
+    monkeypatch.delenv("VIDHI_HNSW_EF_SEARCH", raising=False)
+
+    config = load_app_config(tmp_path)
+
+    assert config.hnsw_m == 2
+    assert config.hnsw_ef_construction == 400
+    assert config.hnsw_ef_search == 100
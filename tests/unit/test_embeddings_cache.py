@@ -19,3 +19,27 @@ def test_hash_embeddings_cache_eviction_respects_limit(monkeypatch) -> None:
         embeddings.embed_query(f"query-{idx}")
 
     assert len(embeddings._cache) <= 128  # noqa: SLF001 - cache behavior verification
+
+
+def test_hash_embeddings_token_slots_match_direct_hashing() -> None:
+    import hashlib
+    import math
+
+    text = "bail granted under section 437 bail"
+    vector = [0.0] * 128
+    for token in text.split():
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "big") % 128] += 1.0 if (digest[4] & 1) == 0 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+
+    assert HashEmbeddings(dimensions=128).embed_documents([text])[0] == [value / norm for value in vector]
+
+
+def test_hash_embeddings_documents_bypass_query_cache() -> None:
+    embeddings = HashEmbeddings(dimensions=128)
+
+    vectors = embeddings.embed_documents(["Bail granted", "bail granted ", "Appeal dismissed"])
+
+    assert vectors[0] == vectors[1] == embeddings.embed_query("Bail granted")
+    assert vectors[0] is not vectors[1]
+    assert len(embeddings._cache) == 1  # noqa: SLF001 - cache behavior verification
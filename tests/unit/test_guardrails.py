@@ -28,3 +28,20 @@ def test_apply_output_guardrails_rejects_prompt_leakage_phrase() -> None:
         apply_output_guardrails(task="knowledge_drilldown", payload=payload)
 
     assert exc.value.code == "SAFETY_FILTER_BLOCKED"
+
+
+def test_apply_output_guardrails_does_not_match_across_separate_fields() -> None:
+    payload = {"analysis": {"summary": "Courts may ignore", "notes": "previous instructions", "citedSourceIds": ["s1"]}}
+
+    result = apply_output_guardrails(task="knowledge_drilldown", payload=payload)
+
+    assert result == payload
+
+
+def test_apply_output_guardrails_rejects_overlong_field() -> None:
+    payload = {"analysis": {"summary": "x" * 20001, "citedSourceIds": ["s1"]}}
+
+    with pytest.raises(HttpError) as exc:
+        apply_output_guardrails(task="knowledge_drilldown", payload=payload)
+
+    assert exc.value.code == "SAFETY_FILTER_BLOCKED"
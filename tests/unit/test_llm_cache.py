@@ -0,0 +1,137 @@
+from backend.app.llm_cache import LlmResponseCache, SemanticResponseCache
+
+
+def test_build_key_ignores_payload_key_order() -> None:
+    left = LlmResponseCache.build_key("m", "issue_spotter", "sys", "task", {"a": 1, "b": [1, 2]})
+    right = LlmResponseCache.build_key("m", "issue_spotter", "sys", "task", {"b": [1, 2], "a": 1})
+
+    assert left == right
+
+
+def test_build_key_changes_with_prompt_or_model() -> None:
+    base = LlmResponseCache.build_key("m", "issue_spotter", "sys", "task", {"a": 1})
+
+    assert base != LlmResponseCache.build_key("m2", "issue_spotter", "sys", "task", {"a": 1})
+    assert base != LlmResponseCache.build_key("m", "issue_spotter", "sys", "task v2", {"a": 1})
+
+
+def test_get_returns_independent_copies_and_counts_hits() -> None:
+    cache = LlmResponseCache(ttl_s=60, max_entries=4)
+    cache.set("k", {"issues": [{"title": "bail"}]})
+
+    first = cache.get("k")
+    assert first == {"issues": [{"title": "bail"}]}
+    first["issues"].append({"title": "mutated"})
+
+    assert cache.get("k") == {"issues": [{"title": "bail"}]}
+    assert cache.get("missing") is None
+    assert cache.snapshot() == {"entries": 1, "hits": 2, "misses": 1}
+
+
+def test_set_evicts_least_recently_used_entry() -> None:
+    cache = LlmResponseCache(ttl_s=60, max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def _bag_of_words(text: str) -> list[float]:
+    vocabulary = ["bail", "theft", "murder", "delhi", "mumbai"]
+    words = text.lower().split()
+    return [float(words.count(term)) for term in vocabulary]
+
+
+def test_semantic_cache_returns_near_duplicate_within_namespace() -> None:
+    cache = SemanticResponseCache(embed=_bag_of_words, threshold=0.95, max_entries=8)
+    cache.set("issue_spotter", cache.embed("bail theft delhi"), {"issues": ["bail"]})
+
+    assert cache.get("issue_spotter", cache.embed("delhi theft bail")) == {"issues": ["bail"]}
+    assert cache.get("case_finder", cache.embed("delhi theft bail")) is None
+    assert cache.get("issue_spotter", cache.embed("murder mumbai")) is None
+
+
+def test_semantic_cache_skips_empty_embeddings() -> None:
+    cache = SemanticResponseCache(embed=_bag_of_words, threshold=0.95, max_entries=8)
+    vector = cache.embed("no known terms")
+
+    cache.set("issue_spotter", vector, {"issues": []})
+
+    assert vector == ()
+    assert cache.get("issue_spotter", vector) is None
+
+
+def test_semantic_cache_eviction_drops_lsh_buckets() -> None:
+    cache = SemanticResponseCache(embed=_bag_of_words, threshold=0.95, max_entries=1)
+    cache.set("issue_spotter", cache.embed("bail theft delhi"), {"issues": ["bail"]})
+    cache.set("issue_spotter", cache.embed("murder mumbai"), {"issues": ["murder"]})
+
+    assert cache.get("issue_spotter", cache.embed("bail theft delhi")) is None
+    assert cache.get("issue_spotter", cache.embed("mumbai murder")) == {"issues": ["murder"]}
+    assert all(entry_ids for entry_ids in cache._buckets.values())  # noqa: SLF001
+    assert len(cache._buckets) == 8  # noqa: SLF001
+
+
+def test_semantic_cache_entries_expire_after_ttl(monkeypatch) -> None:
+    clock = [100.0]
+    monkeypatch.setattr("backend.app.llm_cache.time.monotonic", lambda: clock[0])
+    cache = SemanticResponseCache(embed=_bag_of_words, threshold=0.95, max_entries=8, ttl_s=60)
+    cache.set("issue_spotter", cache.embed("bail theft delhi"), {"issues": ["bail"]})
+
+    clock[0] = 159.0
+    assert cache.get("issue_spotter", cache.embed("bail theft delhi")) == {"issues": ["bail"]}
+    clock[0] = 161.0
+    assert cache.get("issue_spotter", cache.embed("bail theft delhi")) is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_semantic_cache_scans_linearly_while_small() -> None:
+    def _make(linear_scan_max_entries: int) -> SemanticResponseCache:
+        return SemanticResponseCache(
+            embed=lambda text: [float(value) for value in text.split()],
+            threshold=0.95,
+            max_entries=8,
+            lsh_tables=1,
+            lsh_bits=16,
+            linear_scan_max_entries=linear_scan_max_entries,
+        )
+
+    probe = _make(0)
+    stored = probe.embed("1 0")
+    # Find a near neighbour above the threshold that shares no LSH bucket with the stored vector.
+    neighbour = next(
+        vector
+        for vector in (probe.embed(f"1 {step / 100}") for step in range(-32, 33))
+        if probe._bucket_keys("issue_spotter", vector) != probe._bucket_keys("issue_spotter", stored)  # noqa: SLF001
+    )
+
+    lsh_only = _make(0)
+    lsh_only.set("issue_spotter", stored, {"issues": ["bail"]})
+    linear = _make(256)
+    linear.set("issue_spotter", stored, {"issues": ["bail"]})
+
+    assert lsh_only.get("issue_spotter", neighbour) is None
+    assert linear.get("issue_spotter", neighbour) == {"issues": ["bail"]}
+    assert linear.get("case_finder", neighbour) is None
+
+
+def test_semantic_cache_uses_lsh_buckets_once_past_linear_scan_limit() -> None:
+    cache = SemanticResponseCache(embed=_bag_of_words, threshold=0.95, max_entries=16, linear_scan_max_entries=2)
+    for text, issues in (("bail theft delhi", ["bail"]), ("murder mumbai", ["murder"]), ("theft mumbai", ["theft"])):
+        cache.set("issue_spotter", cache.embed(text), {"issues": issues})
+    hashed = []
+    original_bucket_keys = cache._bucket_keys  # noqa: SLF001
+
+    def _recording_bucket_keys(namespace, vector):
+        hashed.append(namespace)
+        return original_bucket_keys(namespace, vector)
+
+    cache._bucket_keys = _recording_bucket_keys  # noqa: SLF001
+
+    assert cache.get("issue_spotter", cache.embed("delhi theft bail")) == {"issues": ["bail"]}
+    assert cache.get("case_finder", cache.embed("delhi theft bail")) is None
+    assert hashed == ["issue_spotter", "case_finder"]
@@ -1,7 +1,7 @@
 import json
 import logging
 
-from backend.app.logging_config import JsonFormatter, configure_logging, get_logger, log_event
+from backend.app.logging_config import REQUEST_ID, JsonFormatter, RequestIdFilter, configure_logging, get_logger, log_event
 
 
 def test_json_formatter_includes_structured_fields() -> None:
@@ -32,3 +32,91 @@ def test_configure_logging_and_log_event() -> None:
     log_event(logger, logging.WARNING, "warning_event", code="TEST", status=400)
 
     assert logger.name == "vidhi.test"
+
+
+def test_log_event_formats_args_lazily_and_skips_disabled_levels(caplog) -> None:
+    logger = get_logger("vidhi.test.lazy")
+    logger.setLevel(logging.INFO)
+
+    with caplog.at_level(logging.INFO, logger="vidhi.test.lazy"):
+        log_event(logger, logging.DEBUG, "debug %s", "hidden", task="x")
+        log_event(logger, logging.INFO, "cache %s for %s", "hit", "issue_spotter", task="issue_spotter")
+
+    assert [record.getMessage() for record in caplog.records] == ["cache hit for issue_spotter"]
+    assert caplog.records[0].structured_fields == {"task": "issue_spotter"}
+
+
+def test_json_formatter_uses_record_creation_time() -> None:
+    record = logging.LogRecord(
+        name="vidhi.test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=10,
+        msg="event",
+        args=(),
+        exc_info=None,
+    )
+    record.created = 0.0
+
+    parsed = json.loads(JsonFormatter().format(record))
+
+    assert parsed["timestamp"] == "1970-01-01T00:00:00+00:00"
+
+
+def test_request_id_filter_tags_records_from_context() -> None:
+    record = logging.LogRecord(
+        name="vidhi.test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=10,
+        msg="event",
+        args=(),
+        exc_info=None,
+    )
+    token = REQUEST_ID.set("req-42")
+    try:
+        assert RequestIdFilter().filter(record)
+    finally:
+        REQUEST_ID.reset(token)
+
+    parsed = json.loads(JsonFormatter().format(record))
+
+    assert parsed["request_id"] == "req-42"
+
+
+def test_json_formatter_renders_exception_traceback() -> None:
+    try:
+        raise ValueError("boom")
+    except ValueError as exc:
+        record = logging.LogRecord(
+            name="vidhi.test",
+            level=logging.ERROR,
+            pathname=__file__,
+            lineno=10,
+            msg="unhandled_exception",
+            args=(),
+            exc_info=(type(exc), exc, exc.__traceback__),
+        )
+
+    parsed = json.loads(JsonFormatter().format(record))
+
+    assert "ValueError: boom" in parsed["exc_info"]
+
+
+def test_json_formatter_keeps_records_with_int_keys_and_big_ints() -> None:
+    formatter = JsonFormatter()
+    record = logging.LogRecord(
+        name="vidhi.test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=10,
+        msg="event",
+        args=(),
+        exc_info=None,
+    )
+    record.structured_fields = {"statusBuckets": {200: 3}, "bytes": 2**70}
+
+    parsed = json.loads(formatter.format(record))
+
+    assert parsed["statusBuckets"] == {"200": 3}
+    assert parsed["bytes"] == 2**70
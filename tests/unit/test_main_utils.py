@@ -1,3 +1,12 @@
+import asyncio
+import hashlib
+import json
+import logging
+
+import pytest
+
+from backend.app import main
+from backend.app.error_handlers import HttpError
 from backend.app.main import compact_content_excerpt, extract_source_fields, is_provision_candidate
 
 
@@ -40,3 +49,387 @@ def test_compact_content_excerpt_truncates_with_ellipsis() -> None:
 
     assert len(excerpt) <= 123
     assert excerpt.endswith("...")
+
+
+def test_extract_source_fields_reads_first_name_and_url() -> None:
+    content = "Held: appeal dismissed\n\nSource: Supreme Court of India\n\nReference URL: https://sci.gov.in/j/1\n\nSource: Other"
+
+    result = extract_source_fields(content)
+
+    assert result == {"sourceName": "Supreme Court of India", "sourceUrl": "https://sci.gov.in/j/1"}
+
+
+def test_extract_source_fields_blank_source_line_keeps_following_url() -> None:
+    result = extract_source_fields("summary\n\nSource: \n\nReference URL: https://x.org/a")
+
+    assert result == {"sourceName": "Unknown Source", "sourceUrl": "https://x.org/a"}
+
+
+def test_extract_source_fields_single_line_layout_keeps_url() -> None:
+    result = extract_source_fields("Source: SCI Reference URL: https://sci.gov.in/j/2")
+
+    assert result["sourceUrl"] == "https://sci.gov.in/j/2"
+    assert result["sourceName"].startswith("SCI")
+
+
+class _CountingClient:
+    def __init__(self, content: str = '{"issues": [{"title": "Bail"}]}') -> None:
+        self.calls = 0
+        self.content = content
+
+    async def post(self, *args, **kwargs):
+        self.calls += 1
+        self.last_kwargs = kwargs
+        await asyncio.sleep(0.01)
+        return main.httpx.Response(200, json={"choices": [{"message": {"content": self.content}}]})
+
+
+def _word_vector(text: str) -> list:
+    words = text.lower().replace("|", " ").split()
+    return [float(words.count(term)) for term in ("bail", "theft", "delhi", "murder")]
+
+
+def test_llm_json_coalesces_identical_inflight_requests(monkeypatch) -> None:
+    client = _CountingClient()
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", None)
+    monkeypatch.setattr(main, "_get_llm_http_client", lambda: client)
+
+    async def run() -> list:
+        payload = {"facts": "coalesce me"}
+        return await asyncio.gather(*[main.llm_json("issue_spotter", payload) for _ in range(3)])
+
+    results = asyncio.run(run())
+
+    assert client.calls == 1
+    assert results[0] == results[1] == results[2] == {"issues": [{"title": "Bail"}]}
+    assert results[0] is not results[1]
+    assert main.LLM_INFLIGHT == {}
+
+
+def test_llm_json_times_out_slow_provider(monkeypatch) -> None:
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", None)
+    monkeypatch.setattr(main, "LLM_TIMEOUT_S", 0.001)
+    monkeypatch.setattr(main, "_get_llm_http_client", lambda: _CountingClient())
+
+    with pytest.raises(HttpError) as exc_info:
+        asyncio.run(main.llm_json("issue_spotter", {"facts": "slow provider"}))
+
+    assert exc_info.value.status == 504
+    assert exc_info.value.code == "LLM_TIMEOUT"
+    assert main.LLM_INFLIGHT == {}
+
+
+def test_llm_json_rejects_non_json_provider_content(monkeypatch) -> None:
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "LLM_FALLBACK_ENABLED", False)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", None)
+    monkeypatch.setattr(main, "_get_llm_http_client", lambda: _CountingClient(content="not json"))
+
+    with pytest.raises(HttpError) as exc_info:
+        asyncio.run(main.llm_json("issue_spotter", {"facts": "bad output"}))
+
+    assert exc_info.value.code == "INVALID_PROVIDER_RESPONSE"
+
+
+def test_semantic_cache_parts_embed_description_and_keep_other_fields_exact() -> None:
+    payload = {"caseFacts": {"facts": " Theft of a bike. ", "jurisdiction": "Delhi", "court": "Saket"}, "issues": ["x"]}
+
+    text, exact_fields = main._semantic_cache_parts(payload)
+
+    assert text == "Theft of a bike.|Delhi"
+    assert exact_fields == {"caseFacts": {"jurisdiction": "Delhi", "court": "Saket"}, "issues": ["x"]}
+    assert main._semantic_cache_parts({"caseFacts": {"jurisdiction": "Delhi"}}) is None
+
+
+def test_llm_json_semantic_cache_requires_exact_non_description_fields(monkeypatch) -> None:
+    from backend.app.llm_cache import SemanticResponseCache
+
+    client = _CountingClient()
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", SemanticResponseCache(embed=_word_vector, threshold=0.95, max_entries=8))
+    monkeypatch.setattr(main, "_get_llm_http_client", lambda: client)
+
+    async def run() -> None:
+        await main.llm_json("issue_spotter", {"caseFacts": {"facts": "bail theft delhi", "jurisdiction": "Delhi"}})
+        await main.llm_json("issue_spotter", {"caseFacts": {"facts": "delhi theft bail", "jurisdiction": "Delhi"}})
+        await main.llm_json("issue_spotter", {"caseFacts": {"facts": "delhi theft bail", "jurisdiction": "Delhi", "court": "HC"}})
+
+    asyncio.run(run())
+
+    assert client.calls == 2
+
+
+def test_response_cache_returns_independent_copies(monkeypatch) -> None:
+    monkeypatch.setattr(main, "RESPONSE_CACHE", {})
+    monkeypatch.setattr(main, "RESPONSE_STALE_CACHE", {})
+    monkeypatch.setattr(main, "RESPONSE_CACHE_EXPIRY", [])
+    value = {"items": [{"title": "Bail"}]}
+    main._response_cache_set("test:copies", value, ttl_s=60)
+    value["items"].append({"title": "mutated"})
+
+    first = main._response_cache_get("test:copies")
+    first["items"].clear()
+
+    assert main._response_cache_get("test:copies") == {"items": [{"title": "Bail"}]}
+    assert main._response_cache_get_stale("test:copies") == {"items": [{"title": "Bail"}]}
+
+
+def test_response_cache_evicts_earliest_expiring_entry(monkeypatch) -> None:
+    monkeypatch.setattr(main, "RESPONSE_CACHE", {})
+    monkeypatch.setattr(main, "RESPONSE_STALE_CACHE", {})
+    monkeypatch.setattr(main, "RESPONSE_CACHE_EXPIRY", [])
+    monkeypatch.setattr(main, "RESPONSE_CACHE_MAX_ENTRIES", 2)
+
+    main._response_cache_set("long", {"v": 1}, ttl_s=600)
+    main._response_cache_set("short", {"v": 2}, ttl_s=30)
+    main._response_cache_set("short", {"v": 3}, ttl_s=900)
+    main._response_cache_set("new", {"v": 4}, ttl_s=60)
+
+    assert main._response_cache_get("long") is None
+    assert main._response_cache_get("short") == {"v": 3}
+    assert main._response_cache_get("new") == {"v": 4}
+
+
+class _ChunkedUpload:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self.read_sizes = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        chunk, self._data = self._data[:size], self._data[size:]
+        return chunk
+
+
+def test_read_upload_capped_hashes_in_chunks_and_rejects_oversized(monkeypatch) -> None:
+    monkeypatch.setattr(main, "UPLOAD_READ_CHUNK_BYTES", 4)
+    upload = _ChunkedUpload(b"judgment text")
+
+    data, digest = asyncio.run(main.read_upload_capped(upload, max_bytes=64))
+
+    assert data == b"judgment text"
+    assert digest == hashlib.sha256(b"judgment text").hexdigest()
+    assert upload.read_sizes == [4, 4, 4, 4, 4]
+
+    oversized = _ChunkedUpload(b"x" * 20)
+    with pytest.raises(HttpError) as exc_info:
+        asyncio.run(main.read_upload_capped(oversized, max_bytes=10))
+
+    assert exc_info.value.status == 413
+    assert exc_info.value.code == "UPLOAD_TOO_LARGE"
+    assert oversized.read_sizes == [4, 4, 4]
+
+
+def test_compact_content_excerpt_collapses_whitespace_like_full_normalization() -> None:
+    content = "  Held:\n\n the   appeal\tis dismissed.  " + "word " * 400
+
+    for limit in (5, 12, 40, 5000):
+        expected = " ".join(content.split())
+        if len(expected) > limit:
+            expected = expected[:limit].rstrip() + "..."
+        assert compact_content_excerpt(content, limit_chars=limit) == expected
+
+
+def test_schedule_cache_refresh_runs_builder_once() -> None:
+    calls: list = []
+
+    async def builder() -> None:
+        calls.append(1)
+
+    async def run() -> None:
+        main._schedule_cache_refresh("test:refresh-once", builder)
+        main._schedule_cache_refresh("test:refresh-once", builder)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert calls == [1]
+
+
+def test_llm_json_sends_pre_encoded_request_body(monkeypatch) -> None:
+    client = _CountingClient()
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", None)
+    monkeypatch.setattr(main, "_get_llm_http_client", lambda: client)
+
+    asyncio.run(main.llm_json("issue_spotter", {"facts": "धारा 420"}))
+
+    body = json.loads(client.last_kwargs["content"])
+    assert "json" not in client.last_kwargs
+    assert body["model"] == main.MODEL
+    assert json.loads(body["messages"][1]["content"])["payload"] == {"facts": "धारा 420"}
+
+
+def test_ground_analysis_citations_drops_unknown_sources() -> None:
+    analysis = {
+        "citedSourceIds": ["s1", "s9"],
+        "applicableProvisionIds": "s1",
+        "citationNotes": [{"sourceId": "s1"}, {"sourceId": "s9"}, "bad"],
+    }
+
+    result = main._ground_analysis_citations(analysis, {"s1"}, ("citedSourceIds", "applicableProvisionIds"))
+
+    assert result["citedSourceIds"] == ["s1"]
+    assert result["applicableProvisionIds"] == []
+    assert result["citationNotes"] == [{"sourceId": "s1"}]
+
+
+def test_provision_analysis_job_stores_grounded_result(monkeypatch) -> None:
+    async def fake_llm_json(task, payload):
+        return {"analysis": {"citedSourceIds": ["s1", "s9"], "applicableProvisionIds": ["s9"], "citationNotes": []}}
+
+    monkeypatch.setattr(main, "llm_json", fake_llm_json)
+    monkeypatch.setattr(main, "PROVISION_ANALYSIS_RESULTS", {})
+
+    asyncio.run(main._run_provision_analysis_job("job-1", "cheating", "", [{"sourceId": "s1"}]))
+
+    stored = main.PROVISION_ANALYSIS_RESULTS["job-1"]
+    assert stored["citedSourceIds"] == ["s1"]
+    assert stored["applicableProvisionIds"] == []
+
+
+def test_fetch_source_snapshot_reuses_recent_extractions(monkeypatch) -> None:
+    calls: list = []
+
+    async def fake_fetch(url: str, max_chars: int) -> str:
+        calls.append(url)
+        return "" if url.endswith("/empty") else f"text from {url}"
+
+    monkeypatch.setattr(main, "_fetch_source_snapshot_uncached", fake_fetch)
+    monkeypatch.setattr(main, "SOURCE_SNAPSHOT_CACHE", main.OrderedDict())
+
+    async def run() -> list:
+        return [
+            await main.fetch_source_snapshot("https://example.org/a"),
+            await main.fetch_source_snapshot("https://example.org/a"),
+            await main.fetch_source_snapshot("https://example.org/empty"),
+            await main.fetch_source_snapshot("https://example.org/empty"),
+        ]
+
+    results = asyncio.run(run())
+
+    assert results == ["text from https://example.org/a"] * 2 + ["", ""]
+    assert calls == ["https://example.org/a", "https://example.org/empty", "https://example.org/empty"]
+
+
+def test_knowledge_endpoints_report_unavailable_service(monkeypatch) -> None:
+    monkeypatch.setattr(main, "KNOWLEDGE_SERVICE", None)
+
+    with pytest.raises(HttpError) as excinfo:
+        asyncio.run(main.clear_provision_cache())
+
+    assert excinfo.value.status == 503
+    assert excinfo.value.code == "KNOWLEDGE_SERVICE_UNAVAILABLE"
+    assert excinfo.value.user_message.startswith("Knowledge search is unavailable")
+
+
+def test_run_agent_task_returns_contract_root(monkeypatch) -> None:
+    async def fake_llm_json(task, payload):
+        return {"issues": [{"title": "Cheating"}]}
+
+    monkeypatch.setattr(main, "llm_json", fake_llm_json)
+
+    result = asyncio.run(main._run_agent_task("issue_spotter", main.GenericAgentRequest(facts="cheating")))
+
+    assert result == [{"title": "Cheating"}]
+
+
+def test_drilldown_does_not_cache_failed_analysis(monkeypatch) -> None:
+    calls: list = []
+
+    async def failing_llm_json(task, payload):
+        calls.append(task)
+        raise RuntimeError("provider down")
+
+    async def fake_snapshot(url: str, max_chars: int = 5000) -> str:
+        return "Held: appeal dismissed."
+
+    monkeypatch.setattr(main, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(main, "llm_json", failing_llm_json)
+    monkeypatch.setattr(main, "fetch_source_snapshot", fake_snapshot)
+    request = main.LiveSearchDrilldownRequest(
+        query="retry drilldown", selected=[{"id": "s1", "url": "https://example.org/j1"}]
+    )
+
+    first = asyncio.run(main.live_search_drilldown(request))
+    asyncio.run(main.live_search_drilldown(request))
+
+    assert first["analysisError"] == "provider down"
+    assert len(calls) == 2
+
+
+def test_source_http_client_is_reused_within_a_loop(monkeypatch) -> None:
+    monkeypatch.setattr(main, "SOURCE_HTTP_CLIENT", None)
+    monkeypatch.setattr(main, "SOURCE_HTTP_CLIENT_LOOP", None)
+
+    async def _twice():
+        first = main._get_source_http_client()
+        second = main._get_source_http_client()
+        await first.aclose()
+        return first, second
+
+    first, second = asyncio.run(_twice())
+    assert first is second
+    assert asyncio.run(_twice())[0] is not first
+
+
+def test_metrics_reports_llm_cache_hit_rates(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+
+    from backend.app.llm_cache import LlmResponseCache, SemanticResponseCache
+
+    exact = LlmResponseCache(ttl_s=60, max_entries=4)
+    exact.set("k", {"issues": []})
+    exact.get("k")
+    exact.get("missing")
+    semantic = SemanticResponseCache(embed=lambda text: [1.0, 0.0], threshold=0.95, max_entries=4)
+    semantic.get("issue_spotter", semantic.embed("bail"))
+    monkeypatch.setattr(main, "LLM_RESPONSE_CACHE", exact)
+    monkeypatch.setattr(main, "SEMANTIC_RESPONSE_CACHE", semantic)
+
+    body = TestClient(main.app).get("/api/v1/metrics").json()
+
+    assert body["llmCache"] == {"entries": 1, "hits": 1, "misses": 1}
+    assert body["llmSemanticCache"] == {"entries": 0, "hits": 0, "misses": 1}
+
+
+def test_unhandled_route_error_is_logged_with_request_id(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+
+    from backend.app.logging_config import RequestIdFilter
+
+    class _FailingQueue:
+        def snapshot(self):
+            raise RuntimeError("queue exploded")
+
+    records = []
+
+    class _Capture(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            records.append(record)
+
+    handler = _Capture()
+    handler.addFilter(RequestIdFilter())
+    main.REQUEST_LOGGER.addHandler(handler)
+    monkeypatch.setattr(main, "BACKGROUND_TASK_QUEUE", _FailingQueue())
+    try:
+        response = TestClient(main.app, raise_server_exceptions=False).get(
+            "/api/v1/queue/stats", headers={"x-request-id": "req-boom"}
+        )
+    finally:
+        main.REQUEST_LOGGER.removeHandler(handler)
+
+    errors = [record for record in records if record.getMessage() == "unhandled_exception"]
+    assert response.status_code == 500
+    assert response.headers["X-Request-Id"] == "req-boom"
+    assert response.json()["code"] == "INTERNAL_ERROR"
+    assert len(errors) == 1
+    assert errors[0].request_id == "req-boom"
+    assert errors[0].exc_info is not None
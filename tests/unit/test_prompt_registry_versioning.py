@@ -26,3 +26,19 @@ def test_task_prompt_versions_cover_all_registered_tasks() -> None:
 
     assert set(versions.keys()) == expected_tasks
     assert all(version != "unversioned" for version in versions.values())
+
+
+def test_manifest_is_parsed_once_while_unchanged(monkeypatch) -> None:
+    from backend.app.prompts import registry
+
+    get_task_prompt_versions()
+    calls: list = []
+    original_loads = registry.json.loads
+    monkeypatch.setattr(registry.json, "loads", lambda data: calls.append(1) or original_loads(data))
+
+    first = get_task_prompt_versions()
+    first["issue_spotter"] = "mutated"
+    get_prompt_manifest_version()
+
+    assert calls == []
+    assert get_task_prompt_versions()["issue_spotter"] != "mutated"
@@ -1,4 +1,6 @@
-from backend.app.services.prompt_service import resolve_system_prompt, resolve_task_prompt
+from pathlib import Path
+
+from backend.app.services.prompt_service import resolve_system_prompt, resolve_task_prompt, warm_prompt_cache
 
 
 def test_resolve_system_prompt_includes_core_contracts() -> None:
@@ -21,3 +23,14 @@ def test_resolve_task_prompt_passthrough_for_custom_prompt() -> None:
 
     assert resolve_task_prompt(custom) == custom
     assert resolve_task_prompt("") == ""
+
+
+def test_warm_prompt_cache_serves_later_reads_from_memory(monkeypatch) -> None:
+    def fail_read(*args, **kwargs):
+        raise AssertionError("prompt file read after warmup")
+
+    warm_prompt_cache()
+    monkeypatch.setattr(Path, "read_text", fail_read)
+
+    assert "You are Vidhi" in resolve_system_prompt()
+    assert resolve_task_prompt("case_finder")
@@ -26,3 +26,55 @@ def test_in_memory_queue_tracks_completed_and_failed_jobs() -> None:
     assert snapshot["active"] == 0
     assert snapshot["completed"] == 1
     assert snapshot["failed"] == 1
+
+
+def test_in_memory_queue_caps_concurrent_jobs() -> None:
+    queue = InMemoryTaskQueue(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def _job() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run() -> None:
+        for _ in range(5):
+            queue.submit("job", _job)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert queue.snapshot()["completed"] == 5
+
+
+def test_in_memory_queue_caps_each_job_kind_separately() -> None:
+    queue = InMemoryTaskQueue(max_concurrency=1)
+
+    async def run() -> bool:
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        async def _warm() -> None:
+            await release.wait()
+
+        async def _analysis() -> None:
+            started.set()
+
+        for idx in range(3):
+            queue.submit(f"provision-url-warm:{idx}", _warm)
+        queue.submit("provision-analysis:job", _analysis)
+        try:
+            await asyncio.wait_for(started.wait(), timeout=0.5)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            release.set()
+            await asyncio.sleep(0.05)
+
+    assert asyncio.run(run()) is True
+    assert queue.snapshot()["completed"] == 4
@@ -0,0 +1,45 @@
+import math
+
+from backend.app.serialization import dumps, dumps_bytes, loads
+
+
+def test_dumps_bytes_round_trips_unicode_payload() -> None:
+    payload = [{"title": "धारा 302", "score": 0.5, "tags": ["ipc"]}]
+
+    encoded = dumps_bytes(payload)
+
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == payload
+
+
+def test_dumps_sort_keys_is_stable_for_hashing() -> None:
+    left = dumps({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True)
+    right = dumps({"a": {"c": 3, "d": 2}, "b": 1}, sort_keys=True)
+
+    assert left == right
+
+
+def test_dumps_indent_produces_multiline_output() -> None:
+    assert "\n" in dumps({"a": 1}, indent=True)
+
+
+def test_dumps_accepts_int_keys_and_big_ints_like_stdlib_json() -> None:
+    encoded = dumps({1: "one", "big": 2**70 + 1})
+
+    assert '"1":"one"' in encoded.replace(" ", "")
+    assert str(2**70 + 1) in encoded
+
+
+def test_dumps_bytes_loads_round_trips_big_ints_and_non_finite_floats() -> None:
+    payload = {"big": 2**70 + 1, "negative": -(2**64), "nan": float("nan"), "inf": float("inf"), "none": None}
+
+    encoded = dumps_bytes(payload)
+    decoded = loads(encoded)
+
+    assert b"NaN" in encoded and b"Infinity" in encoded
+    assert decoded["big"] == 2**70 + 1
+    assert decoded["negative"] == -(2**64)
+    assert math.isnan(decoded["nan"])
+    assert decoded["inf"] == float("inf")
+    assert decoded["none"] is None
+    assert loads(encoded.decode("utf-8"))["big"] == 2**70 + 1
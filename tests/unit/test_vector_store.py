@@ -0,0 +1,72 @@
+from backend.app.knowledge.vector_store import LangChainVectorStore
+
+
+def test_similarity_search_batch_matches_single_queries(tmp_path) -> None:
+    store = LangChainVectorStore(persist_directory=str(tmp_path / "chroma"), collection_name="vidhi_test_cases")
+    store.add_cases(
+        [
+            {"id": "bail-1", "title": "Bail under section 437 CrPC", "text": "Held: bail granted by the court."},
+            {"id": "cheque-1", "title": "Cheque dishonour under section 138", "text": "Held: conviction upheld."},
+        ]
+    )
+
+    queries = ["bail granted", "   ", "cheque dishonour conviction"]
+    batched = store.similarity_search_batch(queries, limit=2)
+
+    assert batched[1] == []
+    assert batched[0] == store.similarity_search(queries[0], limit=2)
+    assert batched[2] == store.similarity_search(queries[2], limit=2)
+    assert batched[0][0]["id"] == "bail-1"
+    assert batched[2][0]["id"] == "cheque-1"
+
+
+def test_add_cases_replaces_stale_chunks_of_changed_cases(tmp_path) -> None:
+    store = LangChainVectorStore(persist_directory=str(tmp_path / "chroma"), collection_name="vidhi_test_cases")
+    long_text = "Held: bail granted by the court. " * 80
+    store.add_cases([{"id": "bail-1", "title": "Bail under section 437 CrPC", "text": long_text}])
+    store.add_cases([{"id": "bail-1", "title": "Bail under section 437 CrPC", "text": "Held: bail refused."}])
+
+    stored = store._store.get(where={"case_id": "bail-1"}, include=["documents"])  # noqa: SLF001
+
+    assert stored["ids"] == ["bail-1-chunk-0"]
+    assert "bail refused" in stored["documents"][0]
+
+
+def test_add_cases_upserts_chunks_in_sized_batches(tmp_path, monkeypatch) -> None:
+    store = LangChainVectorStore(
+        persist_directory=str(tmp_path / "chroma"),
+        collection_name="vidhi_test_cases",
+        add_batch_size=2,
+    )
+    original_add = store._store.add_documents  # noqa: SLF001
+    batch_sizes = []
+
+    def _recording_add(documents, ids):
+        batch_sizes.append(len(ids))
+        return original_add(documents=documents, ids=ids)
+
+    monkeypatch.setattr(store._store, "add_documents", _recording_add)  # noqa: SLF001
+    added = store.add_cases(
+        [{"id": f"case-{idx}", "title": f"Case {idx}", "text": f"Held: order {idx}."} for idx in range(5)]
+    )
+
+    assert added == 5
+    assert batch_sizes == [2, 2, 1]
+    assert store._store._collection.count() == 5  # noqa: SLF001
+
+
+def test_index_cases_skips_unchanged_cases_and_reindexes_modified_ones(tmp_path) -> None:
+    store = LangChainVectorStore(persist_directory=str(tmp_path / "chroma"), collection_name="vidhi_test_cases")
+    cases = [
+        {"id": "bail-1", "title": "Bail under section 437 CrPC", "text": "Held: bail granted."},
+        {"id": "cheque-1", "title": "Cheque dishonour under section 138", "text": "Held: conviction upheld."},
+    ]
+
+    assert store.index_cases(cases) == {"chunks": 2, "unchanged": 0}
+    assert store.index_cases(cases) == {"chunks": 0, "unchanged": 2}
+    assert store.add_cases(cases) == 0
+
+    modified = [dict(cases[0], text="Held: bail refused."), cases[1]]
+    assert store.index_cases(modified) == {"chunks": 1, "unchanged": 1}
+    stored = store._store.get(where={"case_id": "bail-1"}, include=["documents"])  # noqa: SLF001
+    assert "bail refused" in stored["documents"][0]